@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from dataset import CACHE_DIR, dataset_version, load_dataset
+from features import ENGINEERED_COLS, INTEREST_COLS, FeatureTransform
+from io_util import write_text_atomic
+
+# =========================
+# Aggregate store untuk dashboard
+# =========================
+# Semua nilai disimpan sebagai jumlah (sum / count) supaya bisa digabung
+# secara incremental saat ada baris baru; rata-rata dihitung saat dibaca.
+AGG_SCHEMA = 2
+INTEREST_LEVELS = [("Low", 0, 3), ("Medium", 4, 6), ("High", 7, len(INTEREST_COLS))]
+
+_LOCK = threading.Lock()
+_MEMO = {}
+_ENGINEERED = FeatureTransform(ENGINEERED_COLS)
+
+
+def _counts(values):
+    uniq, counts = np.unique(np.asarray(values).astype(np.int64), return_counts=True)
+    return {str(int(u)): int(c) for u, c in zip(uniq, counts)}
+
+
+def _pair_counts(x, y):
+    # histogram 2D per pasangan nilai (nilai minat = hitungan bulat -> pasangan unik sedikit)
+    pairs, counts = np.unique(np.column_stack([x, y]), axis=0, return_counts=True)
+    return {f"{a:g},{b:g}": int(c) for (a, b), c in zip(pairs, counts)}
+
+
+def _merge_counts(a, b):
+    out = dict(a)
+    for key, val in b.items():
+        out[key] = out.get(key, 0) + val
+    return out
+
+
+def compute_aggregates(df):
+    eng = _ENGINEERED.transform(df)
+    total, active, arts, sports = (eng[:, i] for i in range(4))
+    interest_cols = [c for c in INTEREST_COLS if c in df.columns]
+
+    return {
+        "schema": AGG_SCHEMA,
+        "n_rows": int(len(df)),
+        "interest_cols": interest_cols,
+        "friends_sum": float(df["NumberOffriends"].sum()) if "NumberOffriends" in df.columns else None,
+        "interest_sums": {c: float(df[c].sum()) for c in interest_cols},
+        "total_interest_sum": float(total.sum()),
+        "active_count_sum": float(active.sum()),
+        "arts_sum": float(arts.sum()),
+        "sports_sum": float(sports.sum()),
+        "gradyear_counts": _counts(df["gradyear"]) if "gradyear" in df.columns else None,
+        "active_count_hist": _counts(active),
+        "arts_sports_counts": _pair_counts(arts, sports),
+    }
+
+
+def merge_aggregates(base, new):
+    # gabungkan agregat lama + agregat baris baru (append), tanpa baca ulang data lama
+    def add(a, b):
+        return None if a is None or b is None else a + b
+
+    def add_counts(a, b):
+        return None if a is None or b is None else _merge_counts(a, b)
+
+    return {
+        "schema": AGG_SCHEMA,
+        "n_rows": base["n_rows"] + new["n_rows"],
+        "interest_cols": [c for c in base["interest_cols"] if c in new["interest_cols"]],
+        "friends_sum": add(base["friends_sum"], new["friends_sum"]),
+        "interest_sums": {c: base["interest_sums"][c] + new["interest_sums"][c]
+                          for c in base["interest_sums"] if c in new["interest_sums"]},
+        "total_interest_sum": base["total_interest_sum"] + new["total_interest_sum"],
+        "active_count_sum": base["active_count_sum"] + new["active_count_sum"],
+        "arts_sum": base["arts_sum"] + new["arts_sum"],
+        "sports_sum": base["sports_sum"] + new["sports_sum"],
+        "gradyear_counts": add_counts(base["gradyear_counts"], new["gradyear_counts"]),
+        "active_count_hist": _merge_counts(base["active_count_hist"], new["active_count_hist"]),
+        "arts_sports_counts": _merge_counts(base["arts_sports_counts"], new["arts_sports_counts"]),
+    }
+
+
+def _store_path(version):
+    return os.path.join(CACHE_DIR, f"aggregates-{version[:16]}.json")
+
+
+def save_aggregates(agg, version):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    write_text_atomic(_store_path(version), json.dumps(dict(agg, dataset_version=version)))
+    with _LOCK:
+        _MEMO[version] = agg
+
+
+def load_aggregates(source=None, version=None):
+    # dibaca dari store kalau versi dataset sama; kalau belum ada, hitung sekali
+    version = version or dataset_version(source)
+    with _LOCK:
+        if version in _MEMO:
+            return _MEMO[version]
+
+    try:
+        with open(_store_path(version), "r", encoding="utf-8") as f:
+            agg = json.load(f)
+        if agg.get("schema") != AGG_SCHEMA or agg.get("dataset_version") != version:
+            raise ValueError("aggregate store usang")
+    except (OSError, ValueError):
+        # hanya boleh dihitung dari dataset kalau isinya memang versi yang diminta
+        if dataset_version(source) != version:
+            raise ValueError(f"Agregat versi {version[:16]} tidak ada dan dataset sudah berubah.") from None
+        agg = compute_aggregates(load_dataset(source))
+        save_aggregates(agg, version)
+
+    with _LOCK:
+        _MEMO[version] = agg
+    return agg
+
+
+def append_aggregates(base_version, new_version, new_rows):
+    # dipakai saat ingest: agregat versi baru = agregat lama + baris baru (hasil conform_rows).
+    # Agregat versi lama harus sudah dibangun sebelum baris ditambahkan; kalau tidak ada,
+    # versi baru dihitung penuh dari dataset (delta tidak boleh dihitung dua kali).
+    try:
+        base = load_aggregates(version=base_version)
+    except ValueError:
+        return load_aggregates(version=new_version)
+    agg = merge_aggregates(base, compute_aggregates(new_rows))
+    save_aggregates(agg, new_version)
+    return agg
+
+
+# =========================
+# View untuk chart (ukuran tetap, tidak tergantung jumlah siswa)
+# =========================
+def kpis(agg):
+    n = agg["n_rows"]
+    has_interest = len(agg["interest_cols"]) > 0
+    return {
+        "total_siswa": n,
+        "avg_friends": agg["friends_sum"] / n if n and agg["friends_sum"] is not None else np.nan,
+        "avg_active_interest": agg["active_count_sum"] / n if n and has_interest else np.nan,
+        "dominant": "Arts" if agg["arts_sum"] > agg["sports_sum"] else "Sports",
+    }
+
+
+def interest_level_counts(agg):
+    hist = {int(k): v for k, v in agg["active_count_hist"].items()}
+    return [(label, sum(v for k, v in hist.items() if lo <= k <= hi)) for label, lo, hi in INTEREST_LEVELS]
+
+
+def interest_means(agg):
+    n = max(agg["n_rows"], 1)
+    return [(c, agg["interest_sums"][c] / n) for c in INTEREST_COLS if c in agg["interest_sums"]]
+
+
+def arts_sports_points(agg):
+    # titik scatter Arts × Sports + jumlah siswa per titik (ukuran tetap, bukan per siswa)
+    rows = [(*map(float, key.split(",")), count) for key, count in agg["arts_sports_counts"].items()]
+    return pd.DataFrame(rows, columns=["arts_interest", "sports_interest", "count"])
@@ -1,5 +1,11 @@
+import importlib
+import logging
+
+import pandas as pd
 import streamlit as st
 
+from instrumentation import span, trace
+
 # ⬇️ WAJIB PALING ATAS
 st.set_page_config(
     page_title="Clustering Perilaku Sosial Siswa",
@@ -34,32 +40,55 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # =========================
-# TABS
+# NAVIGASI (lazy per halaman)
 # =========================
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "About Dataset",
-    "Dashboards",
-    "Machine Learning",
-    "Prediction App",
-    "Contact Me"
-])
-
-with tab1:
-    import about
-    about.about_dataset()
-
-with tab2:
-    import visualisasi
-    visualisasi.chart()
-
-with tab3:
-    import machine_learning
-    machine_learning.ml_model()
-
-with tab4:
-    import prediction
-    prediction.prediction_app()
-
-with tab5:
-    import kontak
-    kontak.contact_me()
+# Beda dengan st.tabs yang menjalankan isi semua tab di setiap rerun,
+# di sini modul halaman baru di-import & dijalankan saat halamannya dipilih.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+PAGES = [
+    ("About Dataset", "about", "about_dataset", "about"),
+    ("Dashboards", "visualisasi", "chart", "dashboards"),
+    ("Machine Learning", "machine_learning", "ml_model", "machine-learning"),
+    ("Prediction App", "prediction", "prediction_app", "prediction"),
+    ("Contact Me", "kontak", "contact_me", "contact"),
+]
+
+
+def render_diagnostics(tr):
+    # panel diagnostics per render: durasi & memori per tahap, opsional cProfile
+    with st.expander("🔧 Diagnostics", expanded=False):
+        c1, c2 = st.columns(2)
+        c1.checkbox("cProfile (render berikutnya)", key="diag_profile")
+        c2.checkbox("tracemalloc (render berikutnya)", key="diag_memory")
+
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Total render", f"{tr.total_ms:,.1f} ms")
+        m2.metric("RSS proses", f"{tr.rss_mb:,.0f} MB" if tr.rss_mb is not None else "N/A")
+        m3.metric("Puncak alokasi Python", f"{tr.mem_peak_kb / 1024:,.1f} MB" if tr.mem_peak_kb is not None else "—")
+
+        if tr.spans:
+            spans = pd.DataFrame(tr.spans)
+            spans["span"] = ["\u2003" * d + name for d, name in zip(spans["depth"], spans["span"])]
+            st.dataframe(spans.drop(columns="depth"), use_container_width=True, hide_index=True)
+        if tr.profile_text:
+            st.code(tr.profile_text, language="text")
+
+
+def lazy_page(module_name, func_name):
+    def render():
+        profile = st.session_state.get("diag_profile", False)
+        memory = st.session_state.get("diag_memory", False)
+        with trace(f"page={module_name}", profile=profile, memory=memory) as tr:
+            with span("import"):
+                module = importlib.import_module(module_name)
+            getattr(module, func_name)()
+        render_diagnostics(tr)
+    return render
+
+
+pages = [
+    st.Page(lazy_page(module_name, func_name), title=title, url_path=url_path, default=(i == 0))
+    for i, (title, module_name, func_name, url_path) in enumerate(PAGES)
+]
+st.navigation(pages, position="top").run()
@@ -0,0 +1,276 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import resource
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dataset import BASE_DIR, CACHE_DIR
+from instrumentation import rss_mb
+
+# =========================
+# Benchmark headless untuk hot path (training, fitur, prediksi, agregat dashboard)
+# =========================
+# Setiap kasus (size × benchmark) jalan di proses baru supaya peak RSS tidak
+# tercampur antar kasus. Hasil ditulis ke JSON untuk dibandingkan antar commit.
+SCHEMA_SOURCE = os.path.join(BASE_DIR, "students_clustered.csv")
+BENCH_DIR = os.path.join(CACHE_DIR, "bench")
+SIZES = [10_000, 100_000, 1_000_000]
+BENCHMARKS = ["features", "aggregates", "predict_single", "predict_batch", "train"]
+SINGLE_ROWS = 1_000          # jumlah prediksi satu-baris per repeat (tidak tergantung size)
+SEED = 42
+
+
+# =========================
+# Data sintetis dari skema students_clustered.csv
+# =========================
+def synthetic_students(n_rows, seed=SEED, source=SCHEMA_SOURCE):
+    # Bootstrap baris asli (korelasi antar minat tetap terjaga) + jitter kecil di
+    # NumberOffriends supaya tidak sekadar duplikat; dtype sama dengan CSV.
+    base = pd.read_csv(source)
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(base), size=n_rows)
+    df = base.iloc[idx].reset_index(drop=True)
+
+    friends = df["NumberOffriends"].to_numpy()
+    noise = rng.normal(0.0, 0.05, size=n_rows) * friends
+    df["NumberOffriends"] = np.clip(np.rint(friends + noise), 0, None).astype(friends.dtype)
+    return df
+
+
+# =========================
+# Pengukuran memori
+# =========================
+def _reset_peak_rss():
+    # Linux: tulis "5" ke clear_refs me-reset VmHWM -> peak bisa diukur per kasus
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="utf-8") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb():
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # fallback: ru_maxrss (KB di Linux, byte di macOS) tidak bisa di-reset
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+# =========================
+# Kasus benchmark: setup(df) -> (fn, jumlah baris yang diproses per panggilan)
+# =========================
+def _bench_bundle(df):
+    # bundle kecil untuk benchmark prediksi (setup, tidak ikut diukur)
+    from pipeline import FINAL_K, train_pipeline
+    from scorer import CentroidScorer
+    result = train_pipeline(df.head(10_000), k=FINAL_K, k_values=[FINAL_K], n_init=1)
+    bundle = {key: result[key] for key in ("model", "scaler", "used_cols", "transform", "projection")}
+    bundle["scorer"] = CentroidScorer.from_parts(bundle["model"], bundle["scaler"], bundle["used_cols"],
+                                                 bundle["transform"])
+    return bundle
+
+
+def _setup_features(df, params):
+    from features import DEFAULT_TRANSFORM
+    return lambda: DEFAULT_TRANSFORM.transform(df), len(df)
+
+
+def _setup_aggregates(df, params):
+    from aggregates import compute_aggregates, interest_level_counts, interest_means, kpis
+
+    def run():
+        agg = compute_aggregates(df)
+        return kpis(agg), interest_level_counts(agg), interest_means(agg)
+    return run, len(df)
+
+
+def _setup_predict_single(df, params):
+    from features import BASE_COLS
+    from prediction import predict_row
+    bundle = _bench_bundle(df)
+    rows = df[BASE_COLS].head(SINGLE_ROWS).to_dict("records")
+
+    def run():
+        for row in rows:
+            predict_row(bundle, row)
+    return run, len(rows)
+
+
+def _setup_predict_batch(df, params):
+    from features import BASE_COLS
+    from prediction import predict_batch
+    bundle = _bench_bundle(df)
+    roster = df[BASE_COLS]
+    return lambda: predict_batch(bundle, roster), len(roster)
+
+
+def _setup_train(df, params):
+    import feature_selection
+    import model_selection
+    from pipeline import FINAL_K, train_pipeline
+    k_values = range(1, params["k_max"] + 1)
+
+    def run():
+        # tanpa memo sweep / korelasi -> yang diukur training sungguhan
+        model_selection.clear_memo()
+        feature_selection.clear_memo()
+        return train_pipeline(df, k=FINAL_K, k_values=k_values, n_init=params["n_init"],
+                              sil_method=params["silhouette"])
+    return run, len(df)
+
+
+_SETUP = {
+    "features": _setup_features,
+    "aggregates": _setup_aggregates,
+    "predict_single": _setup_predict_single,
+    "predict_batch": _setup_predict_batch,
+    "train": _setup_train,
+}
+
+
+def run_case(name, n_rows, repeat, params):
+    # dijalankan di proses anak: generate data -> setup -> ukur `repeat` kali
+    df = synthetic_students(n_rows)
+    fn, n_items = _SETUP[name](df, params)
+    fn()   # warm-up (import, cache, JIT BLAS) tidak ikut diukur
+
+    rss_before = rss_mb()
+    hwm_reset = _reset_peak_rss()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    peak = _peak_rss_mb()
+
+    best = min(times)
+    return {
+        "benchmark": name,
+        "rows": n_rows,
+        "items_per_call": n_items,
+        "repeat": repeat,
+        "wall_s": {"min": round(best, 6), "median": round(float(np.median(times)), 6),
+                   "max": round(max(times), 6)},
+        "throughput_rows_s": round(n_items / best, 1) if best > 0 else None,
+        "rss_before_mb": round(rss_before, 1) if rss_before is not None else None,
+        "peak_rss_mb": round(peak, 1),
+        "peak_rss_delta_mb": round(peak - rss_before, 1) if hwm_reset and rss_before is not None else None,
+    }
+
+
+# =========================
+# Runner & perbandingan
+# =========================
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment():
+    import sklearn
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_suite(sizes=SIZES, benchmarks=BENCHMARKS, repeat=3, params=None):
+    params = params or {}
+    ctx = mp.get_context("spawn")
+    for n_rows in sizes:
+        for name in benchmarks:
+            # 1 proses baru per kasus -> peak RSS & cache tidak bocor ke kasus berikutnya
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                try:
+                    res = pool.submit(run_case, name, n_rows, repeat, params).result()
+                except Exception as e:
+                    res = {"benchmark": name, "rows": n_rows, "error": f"{type(e).__name__}: {e}"}
+            yield res
+
+
+def compare(current, baseline):
+    # rasio waktu (baru/lama) per (benchmark, rows); > 1 berarti lebih lambat
+    old = {(r["benchmark"], r["rows"]): r for r in baseline["results"] if "error" not in r}
+    rows = []
+    for r in current["results"]:
+        prev = old.get((r["benchmark"], r["rows"]))
+        if prev is None or "error" in r:
+            continue
+        rows.append({
+            "benchmark": r["benchmark"],
+            "rows": r["rows"],
+            "time_ratio": round(r["wall_s"]["min"] / prev["wall_s"]["min"], 3),
+            "peak_rss_ratio": round(r["peak_rss_mb"] / prev["peak_rss_mb"], 3),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hot path clustering, fitur, prediksi & dashboard.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--k-max", type=int, default=10, help="sweep k = 1..k-max untuk benchmark train")
+    parser.add_argument("--n-init", type=int, default=1, help="n_init KMeans untuk benchmark train")
+    parser.add_argument("--silhouette", default="auto")
+    parser.add_argument("--output", default=None,
+                        help="file JSON hasil (default .cache/bench/bench-<commit>-<waktu>.json)")
+    parser.add_argument("--compare", default=None, help="file JSON hasil sebelumnya untuk dibandingkan")
+    args = parser.parse_args()
+
+    params = {"k_max": args.k_max, "n_init": args.n_init, "silhouette": args.silhouette}
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": _environment(),
+        "params": dict(params, repeat=args.repeat, single_rows=SINGLE_ROWS, seed=SEED),
+        "results": [],
+    }
+
+    for res in run_suite(args.sizes, args.only, args.repeat, params):
+        report["results"].append(res)
+        if "error" in res:
+            print(f"❌ {res['benchmark']:<15} {res['rows']:>9,}  {res['error']}")
+        else:
+            print(f"{res['benchmark']:<15} {res['rows']:>9,}  {res['wall_s']['min']:>9.4f}s  "
+                  f"{res['throughput_rows_s']:>13,.0f} baris/s  peak {res['peak_rss_mb']:>7.1f} MB")
+
+    output = args.output or os.path.join(BENCH_DIR, f"bench-{commit or 'nogit'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            report["compare"] = {"baseline": args.compare, "rows": compare(report, json.load(f))}
+        for row in report["compare"]["rows"]:
+            print(f"{row['benchmark']:<15} {row['rows']:>9,}  waktu ×{row['time_ratio']:.3f}  "
+                  f"RSS ×{row['peak_rss_ratio']:.3f}")
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Hasil benchmark disimpan ke {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from features import INTEREST_COLS
+from instrumentation import span
+from io_util import write_atomic, write_text_atomic
+
+# =========================
+# Lokasi file
+# =========================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
+APPEND_DIR = os.path.join(BASE_DIR, "data", "appended")   # batch baris baru dari ingest
+
+# urutan prioritas sumber data (xlsx dulu, sama seperti sebelumnya)
+DATA_SOURCES = ["students_clustered.xlsx", "students_clustered.csv"]
+
+# =========================
+# Schema ringkas dataset siswa (~40 byte/baris, bukan ~180 byte di int64/float64)
+# =========================
+# Minat = hitungan kecil -> uint8 (otomatis naik ke uint16 kalau ada nilai > 255),
+# label cluster -> category. Ganti CACHE_SCHEMA kalau schema berubah supaya
+# cache Arrow lama dibangun ulang.
+DATASET_SCHEMA = {
+    "gradyear": "int16",
+    "NumberOffriends": "uint16",
+    **{c: "uint8" for c in INTEREST_COLS},
+    "clusters": "category",
+    "cluster": "category",
+}
+CACHE_SCHEMA = 2
+_WIDEN_UNSIGNED = ["uint8", "uint16", "uint32", "uint64"]
+_WIDEN_SIGNED = ["int8", "int16", "int32", "int64"]
+
+# cache level proses: dipakai bersama oleh visualisasi & machine_learning
+_LOCK = threading.Lock()
+_LOADED = {}
+
+
+def _resolve_source(source=None):
+    if source is not None:
+        path = source if os.path.isabs(source) else os.path.join(BASE_DIR, source)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File dataset tidak ditemukan: {path}")
+        return path
+
+    for name in DATA_SOURCES:
+        path = os.path.join(BASE_DIR, name)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"Tidak ada file dataset ({', '.join(DATA_SOURCES)}) di {BASE_DIR}")
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _cache_paths(source_path):
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    ext = os.path.splitext(source_path)[1].lstrip(".")
+    base = os.path.join(CACHE_DIR, f"{stem}.{ext}")
+    return base + ".arrow", base + ".meta.json"
+
+
+def _read_source(path):
+    if path.endswith((".xlsx", ".xls")):
+        return pd.read_excel(path)
+    return pd.read_csv(path)
+
+
+def _schema_cast(s, dtype):
+    if dtype == "category":
+        return s.astype("category")
+    # integer: NaN -> 0, lalu tipe schema; kalau nilainya tidak muat, naikkan ke
+    # tipe integer berikutnya (mis. blonde bisa > 255 -> uint16), negatif -> signed
+    values = pd.to_numeric(s, errors="coerce").fillna(0).round()
+    if len(values) == 0:
+        return values.astype(dtype)
+    lo, hi = values.min(), values.max()
+    kind = dtype if lo >= 0 or not dtype.startswith("u") else dtype[1:]
+    ladder = _WIDEN_UNSIGNED if kind.startswith("u") else _WIDEN_SIGNED
+    for candidate in ladder[ladder.index(kind):]:
+        info = np.iinfo(candidate)
+        if info.min <= lo and hi <= info.max:
+            return values.astype(candidate)
+    return values.astype(np.float64)
+
+
+def compact_dtypes(df):
+    # kolom yang dikenal -> tipe di DATASET_SCHEMA; kolom lain:
+    # int64/float64 -> tipe terkecil yang muat, string -> category
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if col in DATASET_SCHEMA:
+            out[col] = _schema_cast(s, DATASET_SCHEMA[col])
+        elif pd.api.types.is_bool_dtype(s):
+            out[col] = s
+        elif pd.api.types.is_integer_dtype(s):
+            kind = "unsigned" if len(s) == 0 or s.min() >= 0 else "integer"
+            out[col] = pd.to_numeric(s, downcast=kind)
+        elif pd.api.types.is_float_dtype(s):
+            out[col] = s.astype(np.float32)
+        elif pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
+            out[col] = s.astype("category")
+        else:
+            out[col] = s
+    return pd.DataFrame(out, index=pd.RangeIndex(len(df)))
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    write_text_atomic(meta_path, json.dumps(meta, indent=2))
+
+
+def _ensure_cache(source_path):
+    # Cek cache: mtime+size sama -> langsung pakai.
+    # mtime beda -> hitung hash; kalau hash sama cukup update meta, kalau beda rebuild.
+    arrow_path, meta_path = _cache_paths(source_path)
+    st_src = os.stat(source_path)
+    meta = _read_meta(meta_path)
+
+    if meta is not None and meta.get("schema") == CACHE_SCHEMA and os.path.exists(arrow_path):
+        if meta.get("mtime_ns") == st_src.st_mtime_ns and meta.get("size") == st_src.st_size:
+            return arrow_path, meta
+
+        sha = file_sha256(source_path)
+        if meta.get("sha256") == sha:
+            meta.update(mtime_ns=st_src.st_mtime_ns, size=st_src.st_size)
+            _write_meta(meta_path, meta)
+            return arrow_path, meta
+    else:
+        sha = file_sha256(source_path)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with span(f"dataset.read_source {os.path.basename(source_path)}"):
+        df = compact_dtypes(_read_source(source_path))
+
+    # Arrow IPC tanpa kompresi -> bisa dibaca zero-copy lewat memory map
+    write_atomic(arrow_path, lambda tmp: feather.write_feather(df, tmp, compression="uncompressed"))
+
+    meta = {
+        "schema": CACHE_SCHEMA,
+        "source": os.path.basename(source_path),
+        "mtime_ns": st_src.st_mtime_ns,
+        "size": st_src.st_size,
+        "sha256": sha,
+        "rows": int(len(df)),
+        "dtypes": {c: str(t) for c, t in df.dtypes.items()},
+    }
+    _write_meta(meta_path, meta)
+    return arrow_path, meta
+
+
+def _append_dir(source_path):
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(APPEND_DIR, stem)
+
+
+def _appended_batches(source_path):
+    # batch hasil ingest bersifat immutable (nama unik) -> urut nama = urut waktu
+    folder = _append_dir(source_path)
+    if not os.path.isdir(folder):
+        return []
+    return sorted(f for f in os.listdir(folder) if f.endswith(".arrow"))
+
+
+def _version(meta, batches):
+    if not batches:
+        return meta["sha256"]
+    h = hashlib.sha256(meta["sha256"].encode())
+    for name in batches:
+        h.update(name.encode())
+    return h.hexdigest()
+
+
+def _freeze(df):
+    # array numpy di belakang frame bersama dibuat read-only (hasil memory map sudah
+    # read-only, hasil concat batch ingest belum): tulis in-place -> ValueError,
+    # bukan diam-diam mengubah data milik semua sesi
+    for values in df._mgr.arrays:
+        if isinstance(values, np.ndarray):
+            values.flags.writeable = False
+    return df
+
+
+def load_dataset(source=None):
+    # DataFrame bersama antar sesi (file sumber + batch ingest). Tiap pemanggil dapat
+    # salinan dangkal: tambah / ganti kolom hanya mengubah salinannya, data di
+    # belakangnya read-only (lihat _freeze), jadi frame di cache tidak bisa berubah.
+    source_path = _resolve_source(source)
+
+    with _LOCK:
+        arrow_path, meta = _ensure_cache(source_path)
+        batches = _appended_batches(source_path)
+        version = _version(meta, batches)
+        cached = _LOADED.get(source_path)
+        if cached is not None and cached[0] == version:
+            return cached[1].copy(deep=False)
+
+        with span("dataset.read_arrow"):
+            table = feather.read_table(arrow_path, memory_map=True)
+            df = table.to_pandas(split_blocks=True)
+        if batches:
+            folder = _append_dir(source_path)
+            parts = [feather.read_table(os.path.join(folder, b), memory_map=True).to_pandas() for b in batches]
+            df = compact_dtypes(pd.concat([df, *parts], ignore_index=True))
+        _LOADED[source_path] = (version, _freeze(df))
+        return df.copy(deep=False)
+
+
+def dataset_version(source=None):
+    # hash isi file sumber (+ daftar batch ingest), dipakai sebagai key cache turunan
+    source_path = _resolve_source(source)
+    with _LOCK:
+        _, meta = _ensure_cache(source_path)
+        return _version(meta, _appended_batches(source_path))
+
+
+def conform_rows(new_rows, source=None):
+    # Kolom disamakan dengan dataset; kolom numerik yang tidak ada / bukan angka diisi 0.
+    base = load_dataset(source)
+    rows = new_rows.reindex(columns=base.columns)
+    numeric = [c for c in base.columns if pd.api.types.is_numeric_dtype(base[c])]
+    rows[numeric] = rows[numeric].apply(pd.to_numeric, errors="coerce").fillna(0)
+    return compact_dtypes(rows)
+
+
+def append_rows(new_rows, source=None):
+    # Simpan baris baru (lihat conform_rows) sebagai batch Arrow terpisah (file sumber tidak diubah).
+    rows = conform_rows(new_rows, source)
+
+    folder = _append_dir(_resolve_source(source))
+    os.makedirs(folder, exist_ok=True)
+    name = f"batch-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.arrow"
+    path = os.path.join(folder, name)
+    write_atomic(path, lambda tmp: feather.write_feather(rows, tmp, compression="uncompressed"))
+    return dataset_version(source)
@@ -0,0 +1,132 @@
+import numpy as np
+import scipy.sparse as sp
+from sklearn import config_context
+from sklearn.metrics import silhouette_samples, silhouette_score
+
+# =========================
+# Konfigurasi evaluasi silhouette
+# =========================
+SILHOUETTE_METHODS = {
+    "auto": "Otomatis (exact untuk data kecil, sampel untuk data besar)",
+    "exact": "Exact (semua pasangan titik)",
+    "sampled": "Sampel terstratifikasi + confidence interval",
+    "simplified": "Simplified (jarak ke centroid, O(n·k))",
+}
+
+EXACT_MAX_ROWS = 20_000     # batas "auto" memakai exact
+DEFAULT_SAMPLE_SIZE = 5_000
+WORKING_MEMORY_MB = 256     # batas memori per blok jarak (MB)
+_CHUNK_ROWS = 65_536
+
+
+def _stratified_sample(labels, sample_size, rng):
+    # alokasi proporsional per cluster, minimal 2 titik per cluster
+    uniq, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    n = len(labels)
+    alloc = np.maximum(np.round(counts * sample_size / n).astype(int), 2)
+    alloc = np.minimum(alloc, counts)
+
+    order = np.argsort(inverse, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    idx = [
+        order[s:s + c][rng.choice(c, size=a, replace=False)]
+        for s, c, a in zip(starts, counts, alloc)
+    ]
+    return np.concatenate(idx), counts, alloc
+
+
+def _sampled(X, labels, sample_size, random_state, z=1.96):
+    rng = np.random.default_rng(random_state)
+    idx, counts, alloc = _stratified_sample(labels, sample_size, rng)
+    Xs, ls = X[idx], labels[idx]
+
+    with config_context(working_memory=WORKING_MEMORY_MB):
+        s = silhouette_samples(Xs, ls)
+
+    # estimator stratified: bobot W_h = N_h / N, varians + koreksi populasi hingga
+    n = counts.sum()
+    weights = counts / n
+    _, ls_inv = np.unique(ls, return_inverse=True)
+    means = np.bincount(ls_inv, weights=s) / alloc
+    sq = np.bincount(ls_inv, weights=s * s)
+    var_h = np.where(alloc > 1, (sq - alloc * means ** 2) / np.maximum(alloc - 1, 1), 0.0)
+    fpc = 1.0 - alloc / counts
+
+    score = float(np.sum(weights * means))
+    se = float(np.sqrt(np.sum(weights ** 2 * var_h / alloc * fpc)))
+    return score, int(len(idx)), (score - z * se, score + z * se)
+
+
+def _simplified(X, labels, centroids=None):
+    # simplified silhouette: a = jarak ke centroid sendiri, b = centroid lain terdekat
+    # X boleh CSR: centroid lewat matriks indikator, jarak dihitung per chunk yang di-densify
+    uniq, inv = np.unique(labels, return_inverse=True)
+    sparse = sp.issparse(X)
+    if centroids is None:
+        counts = np.bincount(inv)
+        if sparse:
+            indicator = sp.csr_matrix((np.ones(len(inv)), (inv, np.arange(len(inv)))),
+                                      shape=(len(uniq), len(inv)))
+            sums = (indicator @ X).toarray()
+        else:
+            sums = np.column_stack([
+                np.bincount(inv, weights=X[:, j], minlength=len(uniq)) for j in range(X.shape[1])
+            ])
+        centroids = sums / counts[:, None]
+    else:
+        centroids = np.asarray(centroids, dtype=float)[uniq]
+
+    c_sq = np.einsum("ij,ij->i", centroids, centroids)
+    total = 0.0
+    for start in range(0, X.shape[0], _CHUNK_ROWS):
+        xb = X[start:start + _CHUNK_ROWS]
+        xb = xb.toarray().astype(float, copy=False) if sparse else np.asarray(xb, dtype=float)
+        lb = inv[start:start + _CHUNK_ROWS]
+        d2 = np.einsum("ij,ij->i", xb, xb)[:, None] - 2 * xb @ centroids.T + c_sq
+        d = np.sqrt(np.maximum(d2, 0.0))
+
+        rows = np.arange(len(xb))
+        a = d[rows, lb]
+        d[rows, lb] = np.inf
+        b = d.min(axis=1)
+        denom = np.maximum(a, b)
+        total += np.sum(np.where(denom > 0, (b - a) / np.where(denom > 0, denom, 1), 0.0))
+    return float(total / X.shape[0])
+
+
+def silhouette(X, labels, method="auto", sample_size=DEFAULT_SAMPLE_SIZE,
+               random_state=42, centroids=None):
+    # Hasil: dict score + metode + jumlah titik yang dipakai (+ CI untuk sampel)
+    labels = np.asarray(labels)
+    n = len(labels)
+    if method not in SILHOUETTE_METHODS:
+        raise ValueError(f"Metode silhouette tidak dikenal: {method}")
+    if len(np.unique(labels)) < 2:
+        raise ValueError("Silhouette butuh minimal 2 cluster.")
+
+    if method == "auto":
+        method = "exact" if n <= EXACT_MAX_ROWS else "sampled"
+    if method == "sampled" and sample_size >= n:
+        method = "exact"
+
+    ci = None
+    if method == "exact":
+        with config_context(working_memory=WORKING_MEMORY_MB):
+            score = float(silhouette_score(X, labels))
+        n_used = n
+    elif method == "sampled":
+        score, n_used, ci = _sampled(X, labels, sample_size, random_state)
+    else:
+        score = _simplified(X, labels, centroids)
+        n_used = n
+
+    return {"score": score, "method": method, "n_used": n_used, "n_total": n, "ci": ci}
+
+
+def describe(result):
+    # teks singkat untuk UI: metode + ukuran sampel
+    text = f"metode: {result['method']}, n = {result['n_used']:,} dari {result['n_total']:,}"
+    if result["ci"] is not None:
+        lo, hi = result["ci"]
+        text += f", 95% CI [{lo:.3f}, {hi:.3f}]"
+    return text
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from memo import LRUMemo
+from model_selection import matrix_fingerprint
+
+# cache hasil per versi dataset (atau hash matriks) + parameter
+_MEMO_SIZE = 8
+_MEMO = LRUMemo(_MEMO_SIZE)
+
+
+def clear_memo():
+    # dipakai benchmark supaya setiap pengukuran benar-benar menghitung ulang
+    _MEMO.clear()
+
+
+def correlation_matrix(X):
+    # standarisasi in-place di satu salinan float32 (akumulasi mean/varians float64),
+    # lalu korelasi = ZᵀZ / (n-1) dalam satu matmul float32
+    X = np.asarray(X)
+    n = len(X)
+    mean = X.mean(axis=0, dtype=np.float64)
+
+    Z = X.astype(np.float32)
+    Z -= mean.astype(np.float32)
+    var = np.einsum("ij,ij->j", Z, Z, dtype=np.float64) / max(n - 1, 1)
+    Z /= np.sqrt(np.where(var > 0, var, 1.0)).astype(np.float32)
+
+    corr = (Z.T @ Z) / np.float32(max(n - 1, 1))
+    np.fill_diagonal(corr, 1.0)
+    return corr, var
+
+
+def select_from_correlation(corr_abs, columns, threshold):
+    # kolom di-drop kalau punya |korelasi| > threshold dengan kolom sebelumnya (segitiga atas)
+    upper = np.triu(corr_abs, k=1)
+    high = upper > threshold
+    drop = high.any(axis=0)
+
+    rows, cols = np.nonzero(high)
+    order = np.lexsort((rows, cols))   # urut per kolom, sama seperti loop lama
+    high_pairs = [(columns[r], columns[c], float(upper[r, c])) for r, c in zip(rows[order], cols[order])]
+    return drop, high_pairs
+
+
+def correlation_filter(df_clean, threshold, zero_ratio_max, version=None):
+    key = (version or matrix_fingerprint(df_clean.to_numpy()), tuple(df_clean.columns),
+           threshold, zero_ratio_max)
+    cached = _MEMO.get(key)
+    if cached is not None:
+        return cached
+
+    columns = df_clean.columns.to_numpy()
+    X = df_clean.to_numpy()
+    corr, var = correlation_matrix(X)
+
+    # buang kolom varians 0 & kolom yang hampir selalu 0 (biar heatmap nggak banyak kosong)
+    zero_ratio = (X == 0).mean(axis=0)
+    keep = np.flatnonzero((var > 0) & (zero_ratio < zero_ratio_max))
+    corr_cols = columns[keep].tolist()
+
+    sub = corr[np.ix_(keep, keep)]
+    drop, high_pairs = select_from_correlation(np.abs(sub), corr_cols, threshold)
+    used = np.flatnonzero(~drop)
+    used_cols = [corr_cols[i] for i in used]
+
+    result = {
+        "corr_columns": corr_cols,
+        "to_drop": [corr_cols[i] for i in np.flatnonzero(drop)],
+        "high_pairs": high_pairs,
+        "used_cols": used_cols,
+        "corr_filtered": pd.DataFrame(sub[np.ix_(used, used)], index=used_cols, columns=used_cols),
+    }
+
+    _MEMO.put(key, result)
+    return result
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+# =========================
+# Definisi kolom (layout tetap untuk training, dashboard & prediksi)
+# =========================
+SPORTS_COLS = [
+    "basketball", "football", "soccer", "softball", "volleyball",
+    "swimming", "cheerleading", "baseball", "tennis", "sports",
+]
+ARTS_COLS = ["dance", "band", "marching", "music", "rock", "hair", "dress", "blonde"]
+INTEREST_COLS = SPORTS_COLS + ARTS_COLS
+
+BASE_COLS = ["gradyear", "NumberOffriends"] + INTEREST_COLS
+ENGINEERED_COLS = ["total_interest", "active_interest_count", "arts_interest", "sports_interest"]
+FEATURE_COLS = BASE_COLS + ENGINEERED_COLS
+
+_CHUNK_ROWS = 65_536
+
+
+class FeatureTransform:
+    # Transform fitur terkompilasi: index kolom dihitung sekali di __init__,
+    # agregat minat (total, jumlah aktif, arts, sports) = satu perkalian matriks
+    # [nilai minat | minat > 0] @ W. Satu baris dan sejuta baris lewat jalur yang sama.
+
+    def __init__(self, output_cols=None):
+        self.input_cols = list(BASE_COLS)
+        self.output_cols = list(output_cols) if output_cols is not None else list(FEATURE_COLS)
+
+        all_cols = self.input_cols + ENGINEERED_COLS
+        unknown = [c for c in self.output_cols if c not in all_cols]
+        if unknown:
+            raise ValueError(f"Kolom fitur tidak dikenal: {unknown}")
+
+        self._interest_idx = np.array([self.input_cols.index(c) for c in INTEREST_COLS])
+        self._out_idx = np.array([all_cols.index(c) for c in self.output_cols])
+
+        m = len(INTEREST_COLS)
+        weights = np.zeros((2 * m, len(ENGINEERED_COLS)))
+        weights[:m, 0] = 1.0                                        # total_interest
+        weights[m:, 1] = 1.0                                        # active_interest_count
+        weights[:m, 2] = [c in ARTS_COLS for c in INTEREST_COLS]    # arts_interest
+        weights[:m, 3] = [c in SPORTS_COLS for c in INTEREST_COLS]  # sports_interest
+        self._weights = weights
+
+    def _as_matrix(self, data, dtype):
+        # matriks kerja (n, input + engineered) sekali alokasi; kolom input langsung
+        # ditulis ke sini, kolom engineered diisi di transform()
+        n_in = len(self.input_cols)
+        if isinstance(data, dict):
+            n_rows = 1
+        elif isinstance(data, pd.DataFrame):
+            n_rows = len(data)
+        else:
+            data = np.asarray(data)
+            if data.ndim == 1:
+                data = data[None, :]
+            if data.shape[1] != n_in:
+                raise ValueError(f"Array harus punya {n_in} kolom ({', '.join(self.input_cols)}).")
+            n_rows = len(data)
+
+        M = np.zeros((n_rows, n_in + len(ENGINEERED_COLS)), dtype=dtype)
+        if isinstance(data, dict):
+            M[0, :n_in] = [float(data.get(c, 0) or 0) for c in self.input_cols]
+        elif isinstance(data, pd.DataFrame):
+            for j, c in enumerate(self.input_cols):
+                if c not in data.columns:
+                    continue
+                col = data[c]
+                if not pd.api.types.is_numeric_dtype(col):
+                    col = pd.to_numeric(col, errors="coerce")
+                M[:, j] = col.to_numpy(dtype=dtype, na_value=np.nan)
+        else:
+            M[:, :n_in] = data
+
+        # inf / NaN -> 0 (sama dengan pembersihan di ml_model)
+        if not np.isfinite(M).all():
+            np.nan_to_num(M, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+        return M
+
+    def transform(self, data, dtype=np.float64):
+        # dtype=np.float32 untuk training (setengah memori); prediksi tetap float64
+        M = self._as_matrix(data, dtype)
+        n_in = len(self.input_cols)
+        weights = self._weights.astype(dtype)
+        # per blok baris supaya matriks sementara [minat | minat > 0] tetap kecil
+        for start in range(0, len(M), _CHUNK_ROWS):
+            rows = slice(start, start + _CHUNK_ROWS)
+            block = M[rows, self._interest_idx]
+            M[rows, n_in:] = np.concatenate([block, block > 0], axis=1) @ weights
+        if np.array_equal(self._out_idx, np.arange(M.shape[1])):
+            return M   # layout penuh -> tanpa salinan
+        return M[:, self._out_idx]
+
+    def transform_frame(self, df, dtype=np.float64):
+        # DataFrame satu blok di atas matriks hasil transform (tanpa salinan)
+        index = df.index if isinstance(df, pd.DataFrame) else None
+        return pd.DataFrame(self.transform(df, dtype=dtype), columns=self.output_cols, index=index, copy=False)
+
+
+DEFAULT_TRANSFORM = FeatureTransform()
@@ -0,0 +1,157 @@
+import argparse
+import copy
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from aggregates import append_aggregates, load_aggregates
+from dataset import append_rows, conform_rows, dataset_version
+from registry import load_bundle, save_bundle
+
+# batas drift proporsi cluster sebelum disarankan retrain penuh
+PSI_RETRAIN = 0.20
+TVD_RETRAIN = 0.10
+
+
+def _baseline_sizes(bundle):
+    manifest = bundle["manifest"] or {}
+    sizes = (manifest.get("metrics") or {}).get("cluster_sizes")
+    if sizes:
+        return np.asarray(sizes, dtype=np.float64)
+    labels = getattr(bundle["model"], "labels_", None)
+    if labels is None:
+        return None
+    # labels_ hanya boleh dipakai kalau mencakup semua baris training
+    # (MiniBatchKMeans hanya menyimpan label mini-batch terakhir)
+    rows = (manifest.get("data") or {}).get("rows")
+    if rows is not None and len(labels) != int(rows):
+        raise ValueError(f"Bundle {bundle['version']} tidak punya cluster_sizes dan labels_ model hanya "
+                         f"{len(labels):,} dari {int(rows):,} baris training. Latih ulang bundle ini.")
+    return np.bincount(labels, minlength=bundle["model"].n_clusters).astype(np.float64)
+
+
+def cluster_drift(baseline_sizes, new_labels, k):
+    # drift proporsi cluster: selisih per cluster, total variation distance, PSI
+    new_sizes = np.bincount(new_labels, minlength=k).astype(np.float64)
+    p_new = new_sizes / new_sizes.sum()
+    report = {"new_counts": new_sizes.astype(int).tolist(), "new_share": p_new.round(4).tolist()}
+    if baseline_sizes is None:
+        return report
+
+    p_old = baseline_sizes / baseline_sizes.sum()
+    eps = 1e-4
+    psi = float(np.sum((p_new - p_old) * np.log((p_new + eps) / (p_old + eps))))
+    tvd = float(0.5 * np.abs(p_new - p_old).sum())
+    report.update(
+        baseline_share=p_old.round(4).tolist(),
+        delta=(p_new - p_old).round(4).tolist(),
+        tvd=round(tvd, 4),
+        psi=round(psi, 4),
+        retrain_recommended=bool(psi > PSI_RETRAIN or tvd > TVD_RETRAIN),
+    )
+    return report
+
+
+def _rescale_centroids(centers, old_scaler, new_scaler, idx):
+    # centroid ada di ruang scaled lama -> balik ke skala asli -> ruang scaled baru
+    raw = centers * old_scaler.scale_[idx] + old_scaler.mean_[idx]
+    return (raw - new_scaler.mean_[idx]) / new_scaler.scale_[idx]
+
+
+def _rescale_projection(projection, old_scaler, new_scaler, idx):
+    # proyeksi tetap menunjuk ke posisi yang sama di ruang asli setelah scaler berubah:
+    # mean ikut di-rescale seperti centroid, komponen dikali rasio scale baru/lama
+    if projection is None:
+        return None
+    projection = copy.copy(projection)
+    projection.mean = _rescale_centroids(projection.mean, old_scaler, new_scaler, idx)
+    projection.components = projection.components * (new_scaler.scale_[idx] / old_scaler.scale_[idx])
+    return projection
+
+
+def ingest(new_rows, refresh_centroids=False):
+    t0 = time.perf_counter()
+    bundle = load_bundle()
+    model, scaler, used_cols, transform = bundle["model"], bundle["scaler"], bundle["used_cols"], bundle["transform"]
+    expected = list(scaler.feature_names_in_)
+    idx = [expected.index(c) for c in used_cols]
+
+    features = transform.transform_frame(new_rows)[expected]
+
+    # =========================
+    # 1) Update scaler (running mean & varians) -> salinan, bundle lama tidak diubah
+    # =========================
+    new_scaler = copy.deepcopy(scaler)
+    new_scaler.partial_fit(features)
+
+    new_model = copy.deepcopy(model)
+    new_model.cluster_centers_ = np.ascontiguousarray(
+        _rescale_centroids(model.cluster_centers_, scaler, new_scaler, idx)
+    )
+
+    X_new = new_scaler.transform(features)[:, idx]
+    labels = new_model.predict(X_new)
+
+    # =========================
+    # 2) Opsional: refresh centroid ala mini-batch (rata-rata berbobot jumlah anggota)
+    # =========================
+    baseline = _baseline_sizes(bundle)
+    k = new_model.n_clusters
+    if refresh_centroids and baseline is not None:
+        counts_new = np.bincount(labels, minlength=k).astype(np.float64)
+        sums_new = np.column_stack([
+            np.bincount(labels, weights=X_new[:, j], minlength=k) for j in range(X_new.shape[1])
+        ])
+        total = baseline + counts_new
+        centers = (new_model.cluster_centers_ * baseline[:, None] + sums_new) / np.maximum(total, 1)[:, None]
+        new_model.cluster_centers_ = np.ascontiguousarray(centers)
+        labels = new_model.predict(X_new)
+
+    drift = cluster_drift(baseline, labels, k)
+
+    # =========================
+    # 3) Simpan baris ke dataset store + agregat dashboard + bundle baru
+    # =========================
+    # agregat versi lama dibangun dulu (sebelum append) supaya baris baru tidak terhitung dua kali
+    base_version = dataset_version()
+    load_aggregates(version=base_version)
+    rows = conform_rows(new_rows)
+    new_version = append_rows(rows)
+    append_aggregates(base_version, new_version, rows)
+
+    manifest = copy.deepcopy(bundle["manifest"] or {})
+    metrics = manifest.setdefault("metrics", {})
+    if baseline is not None:
+        metrics["cluster_sizes"] = (baseline + np.bincount(labels, minlength=k)).astype(int).tolist()
+    data = manifest.setdefault("data", {})
+    data.update(sha256=new_version, rows=int(data.get("rows", 0)) + len(new_rows))
+    manifest.update(
+        mode="ingest",
+        k=k,
+        parent=bundle["version"],
+        ingest={"rows": len(new_rows), "refresh_centroids": refresh_centroids, "drift": drift},
+        timing={"total": round(time.perf_counter() - t0, 4)},
+    )
+    version = save_bundle(new_model, new_scaler, used_cols, manifest, transform=transform,
+                          projection=_rescale_projection(bundle.get("projection"), scaler, new_scaler, idx))
+
+    return {"version": version, "rows": len(new_rows), "labels": labels, "drift": drift}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tambah data siswa baru tanpa retrain penuh.")
+    parser.add_argument("path", help="file CSV/Parquet berisi baris siswa baru")
+    parser.add_argument("--refresh-centroids", action="store_true",
+                        help="geser centroid dengan baris baru (mini-batch update)")
+    args = parser.parse_args()
+
+    rows = pd.read_parquet(args.path) if args.path.endswith(".parquet") else pd.read_csv(args.path)
+    report = ingest(rows, refresh_centroids=args.refresh_centroids)
+    print(f"✅ {report['rows']:,} baris di-ingest -> bundle {report['version']}")
+    print(json.dumps(report["drift"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
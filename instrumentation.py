@@ -0,0 +1,140 @@
+import contextlib
+import contextvars
+import cProfile
+import io
+import json
+import logging
+import pstats
+import time
+import tracemalloc
+
+# =========================
+# Span timing per tahap (+ opsional cProfile / tracemalloc)
+# =========================
+# Satu Trace per render halaman. span("nama") mencatat durasi (dan puncak memori
+# Python kalau tracemalloc aktif) ke trace yang sedang berjalan + log terstruktur.
+# Tanpa trace aktif, span() hampir tanpa biaya (dipakai juga di modul non-UI).
+PROFILE_TOP_N = 30
+
+logger = logging.getLogger("instrumentation")
+_CURRENT = contextvars.ContextVar("instrumentation_trace", default=None)
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class Stopwatch:
+    # durasi per tahap training (detik, 4 desimal) -> "timings" di hasil pipeline.
+    # lap(nama) mencatat waktu sejak lap sebelumnya (atau sejak dibuat).
+
+    def __init__(self):
+        self.timings = {}
+        self._t = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.timings[name] = round(now - self._t, 4)
+        self._t = now
+
+
+class Trace:
+    def __init__(self, name, profile=False, memory=False):
+        self.name = name
+        self.profile = profile
+        self.memory = memory
+        self.spans = []
+        self.total_ms = None
+        self.rss_mb = None
+        self.mem_peak_kb = None
+        self.profile_text = None
+        self._stack = []
+        self._profiler = None
+        self._own_tracemalloc = False
+
+    def _start(self):
+        self._t0 = time.perf_counter()
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._own_tracemalloc = True
+            tracemalloc.reset_peak()
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def _finish(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+            self.profile_text = out.getvalue()
+        if self.memory:
+            self.mem_peak_kb = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+            if self._own_tracemalloc:
+                tracemalloc.stop()
+        self.total_ms = round((time.perf_counter() - self._t0) * 1000, 2)
+        self.rss_mb = rss_mb()
+
+    def summary(self):
+        return {
+            "trace": self.name,
+            "total_ms": self.total_ms,
+            "rss_mb": round(self.rss_mb, 1) if self.rss_mb is not None else None,
+            "mem_peak_kb": self.mem_peak_kb,
+            "spans": self.spans,
+        }
+
+
+def current_trace():
+    return _CURRENT.get()
+
+
+@contextlib.contextmanager
+def trace(name, profile=False, memory=False):
+    tr = Trace(name, profile=profile, memory=memory)
+    token = _CURRENT.set(tr)
+    tr._start()
+    try:
+        yield tr
+    finally:
+        tr._finish()
+        _CURRENT.reset(token)
+        logger.info(json.dumps(dict(tr.summary(), event="trace", spans=len(tr.spans))))
+
+
+@contextlib.contextmanager
+def span(name):
+    tr = _CURRENT.get()
+    if tr is None:
+        yield
+        return
+
+    parent = tr._stack[-1] if tr._stack else None
+    record = {"span": name, "depth": len(tr._stack), "ms": None}
+    frame = {"peak": 0}
+    tr._stack.append(frame)
+    tr.spans.append(record)   # urut waktu mulai; durasi diisi saat span selesai
+    if tr.memory:
+        mem_start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record["ms"] = round((time.perf_counter() - t0) * 1000, 2)
+        tr._stack.pop()
+        if tr.memory:
+            # reset_peak di span anak menghapus puncak induk -> simpan maks di frame
+            peak = max(tracemalloc.get_traced_memory()[1], frame["peak"])
+            record["mem_peak_kb"] = round(max(peak - mem_start, 0) / 1024, 1)
+            if parent is not None:
+                parent["peak"] = max(parent["peak"], peak)
+        logger.info(json.dumps(dict(record, event="span", trace=tr.name)))
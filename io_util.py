@@ -0,0 +1,37 @@
+import os
+import uuid
+
+# =========================
+# Tulis file secara atomic (temp file -> os.replace)
+# =========================
+# Nama temp unik per proses + per panggilan: dua thread / proses yang menulis
+# path yang sama tidak saling menimpa file temp. Pembaca hanya pernah melihat
+# file lama atau file baru yang lengkap.
+
+
+def temp_path(path):
+    return f"{path}.tmp{os.getpid()}.{uuid.uuid4().hex[:6]}"
+
+
+def write_atomic(path, write_fn):
+    # write_fn(tmp) menulis isi lengkap ke tmp; kalau gagal, tmp dibuang
+    tmp = temp_path(path)
+    try:
+        write_fn(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_text_atomic(path, text, fsync=False):
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+    write_atomic(path, write)
@@ -1,17 +1,26 @@
+import os
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
-from sklearn.decomposition import PCA
+from dataset import dataset_version, load_dataset
+from ml_report import TOP_N_INTEREST, interest_columns, load_cluster_report, load_features_report, top_interests
+from profiling import PROFILE_STATS
+from model_selection import K_SELECTION_MODES, describe_fits
+from pipeline import SWEEP_N_JOBS
+from plotting import render_caption, scatter_auto
+from registry import latest_manifest
+from evaluation import DEFAULT_SAMPLE_SIZE, SILHOUETTE_METHODS, describe as describe_silhouette
+from instrumentation import span
 
 def ml_model():
     # =========================
     # 0) Load Dataset
     # =========================
-    df = pd.read_excel("students_clustered.xlsx")
+    with span("ml.0_load_dataset"):
+        df = load_dataset()
+        version = dataset_version()
 
     st.write("### Preview Dataset")
     st.dataframe(df.head(10), use_container_width=True)
@@ -20,21 +29,21 @@ def ml_model():
     # =========================
     # 1) Ambil Kolom Numerik
     # =========================
-    numbers = df.select_dtypes(include=[np.number]).columns.tolist()
-    numbers = [c for c in numbers if c not in ["cluster", "clusters"]]  # buang kolom cluster kalau ada
-
-    if len(numbers) == 0:
+    # layout fitur tetap dari FeatureTransform (kolom cluster tidak ikut), inf/NaN -> 0.
+    # Semua angka/tabel tab ini diambil dari result cache di disk (per versi dataset
+    # + config, dipakai bersama antar sesi); hanya figure yang dibuat ulang.
+    try:
+        with span("ml.1_features_report"):
+            features_report, _ = load_features_report(df, version)
+    except ValueError:
         st.error("Tidak ada kolom numerik. Proses machine learning tidak bisa dilanjutkan.")
         st.stop()
 
-    df_ml = df[numbers].copy()
-
     # =========================================================
     # 2) Keep OUTLIER (tidak dihapus)
     # =========================================================
     st.write("### 1. Outlier Handling")
     st.info("Pada dataset ini, data **tidak dihapus outlier**. Semua baris numerik tetap digunakan.")
-    df_clean = df_ml.copy()
     st.markdown("---")
 
     # =========================
@@ -42,17 +51,8 @@ def ml_model():
     # =========================
     st.write("### 2. Normalisasi menggunakan StandardScaler")
 
-    df_clean_safe = df_clean.replace([np.inf, -np.inf], np.nan).fillna(0)
-
-    scaler = StandardScaler()
-    df_scaled = pd.DataFrame(
-        scaler.fit_transform(df_clean_safe),
-        columns=df_clean_safe.columns,
-        index=df_clean_safe.index
-    )
-
     st.write("**Preview data setelah normalisasi:**")
-    st.dataframe(df_scaled.head(10), use_container_width=True)
+    st.dataframe(features_report["scaled_preview"], use_container_width=True)
     st.markdown("---")
 
     # =========================
@@ -60,48 +60,21 @@ def ml_model():
     # =========================
     st.write("### 3. Correlation Heatmap")
 
-    corr_df = df_clean_safe.copy()
-
-    # buang kolom varians 0
-    corr_df = corr_df.loc[:, corr_df.var() > 0]
-
-    # buang kolom yang hampir selalu 0 (biar heatmap nggak banyak kosong)
-    zero_ratio = (corr_df == 0).mean()
-    corr_df = corr_df.loc[:, zero_ratio < 0.99]
-
-    if corr_df.shape[1] < 2:
+    if len(features_report["corr_columns"]) < 2:
         st.warning("Heatmap tidak dapat ditampilkan karena kolom yang tersisa kurang dari 2.")
         st.stop()
 
-    threshold = 0.80
-    corr_abs = corr_df.corr().abs()
+    corr_filtered = features_report["corr_filtered"].round(2)
 
-    # segitiga atas agar tidak double
-    upper = corr_abs.where(np.triu(np.ones(corr_abs.shape), k=1).astype(bool))
-
-    # kolom yang harus di-drop (punya korelasi > threshold dengan kolom lain)
-    to_drop = [col for col in upper.columns if (upper[col] > threshold).any()]
-
-    # daftar pasangan korelasi tinggi untuk ditampilkan
-    high_pairs = []
-    for col in upper.columns:
-        high = upper[col][upper[col] > threshold]
-        for row_name, val in high.items():
-            high_pairs.append((row_name, col, float(val)))
-
-    # dataframe final untuk heatmap
-    corr_df_filtered = corr_df.drop(columns=to_drop, errors="ignore")
-
-    corr_filtered = corr_df_filtered.corr().round(2)
-
-    fig_heat = px.imshow(
-        corr_filtered,
-        text_auto=True,
-        aspect="auto",
-        color_continuous_scale="Blues"
-    )
-    fig_heat.update_layout(height=650, margin=dict(l=10, r=10, t=50, b=10))
-    st.plotly_chart(fig_heat, use_container_width=True)
+    with span("ml.4_heatmap_figure"):
+        fig_heat = px.imshow(
+            corr_filtered,
+            text_auto=True,
+            aspect="auto",
+            color_continuous_scale="Blues"
+        )
+        fig_heat.update_layout(height=650, margin=dict(l=10, r=10, t=50, b=10))
+        st.plotly_chart(fig_heat, use_container_width=True)
 
     st.markdown("---")
 
@@ -113,57 +86,91 @@ def ml_model():
     # IMPORTANT:
     # - Clustering pakai fitur hasil drop korelasi (lebih aman)
     # - Tetap pakai versi scaled agar skala setara
-    used_cols = corr_df_filtered.columns.tolist()
+    used_cols = features_report["used_cols"]
 
     if len(used_cols) < 2:
         st.warning("Kolom yang tersisa untuk clustering kurang dari 2. Turunkan threshold atau cek data.")
         st.stop()
 
-    X = df_scaled[used_cols].values
-
-    # Elbow boleh dari k=1
-    k_elbow = list(range(1, 11))
-    inertias = []
-    for k in k_elbow:
-        km = KMeans(n_clusters=k, random_state=42, n_init=10)
-        km.fit(X)
-        inertias.append(km.inertia_)
-
-    # Silhouette harus dari k=2
-    k_sil = list(range(2, 11))
-    sil_scores = []
-    for k in k_sil:
-        km = KMeans(n_clusters=k, random_state=42, n_init=10)
-        labels = km.fit_predict(X)
-        sil_scores.append(silhouette_score(X, labels))
-
-    colA, colB = st.columns(2)
-
-    with colA:
-        fig_elbow = px.line(
-            x=k_elbow, y=inertias, markers=True,
-            labels={"x": "Jumlah Cluster (k)", "y": "Inertia"},
-            title="Elbow Method"
+    # metode evaluasi silhouette (exact O(n²) / sampel / simplified O(n·k))
+    colM, colN, colP = st.columns([2, 1, 1])
+    with colM:
+        sil_method = st.selectbox(
+            "Metode evaluasi silhouette",
+            options=list(SILHOUETTE_METHODS),
+            format_func=SILHOUETTE_METHODS.get,
         )
-        fig_elbow.update_layout(height=420, margin=dict(l=10, r=10, t=50, b=10))
-        st.plotly_chart(fig_elbow, use_container_width=True)
-
-    with colB:
-        fig_sil = px.line(
-            x=k_sil, y=sil_scores, markers=True,
-            labels={"x": "Jumlah Cluster (k)", "y": "Silhouette Score"},
-            title="Silhouette Score"
+    with colN:
+        sil_sample_size = st.number_input(
+            "Ukuran sampel", min_value=500, max_value=50_000,
+            value=DEFAULT_SAMPLE_SIZE, step=500,
+            disabled=sil_method not in ("auto", "sampled"),
         )
-        fig_sil.update_layout(height=420, margin=dict(l=10, r=10, t=50, b=10))
-        st.plotly_chart(fig_sil, use_container_width=True)
-
-    best_k = k_sil[int(np.argmax(sil_scores))]
-    best_sil = float(np.max(sil_scores))
+    with colP:
+        # >1: fit (k, seed) paralel di process pool + metrik stabilitas antar seed
+        n_jobs = st.number_input("Proses paralel", min_value=1, max_value=os.cpu_count() or 1,
+                                 value=SWEEP_N_JOBS, step=1)
+
+    # fixed: sweep k = 1..10 lalu k final = FINAL_K; otomatis: naik dari k = 2 dengan
+    # warm start, berhenti saat kriteria plateau, k terpilih dipakai untuk model final
+    k_select = st.selectbox("Pemilihan jumlah cluster", options=list(K_SELECTION_MODES),
+                            format_func=K_SELECTION_MODES.get)
+
+    # Elbow boleh dari k=1, silhouette harus dari k=2
+    # tiap k cukup di-fit sekali; sweep, profiling & PCA di-cache per (versi dataset, config)
+    try:
+        with span("ml.5_cluster_report"):
+            report, cached = load_cluster_report(df, version, sil_method=sil_method,
+                                                 sil_sample_size=int(sil_sample_size), n_jobs=int(n_jobs),
+                                                 k_select=k_select)
+    except ValueError as e:
+        st.error(f"Clustering tidak bisa dilanjutkan: {e}")
+        st.stop()
+    sweep = report["sweep"]
+    final_k = report["final_k"]
+    k_elbow, inertias = sweep["k_elbow"], sweep["inertias"]
+    k_sil, sil_scores = sweep["k_sil"], sweep["sil_scores"]
+
+    with span("ml.5_elbow_silhouette_figures"):
+        colA, colB = st.columns(2)
+
+        with colA:
+            fig_elbow = px.line(
+                x=k_elbow, y=inertias, markers=True,
+                labels={"x": "Jumlah Cluster (k)", "y": "Inertia"},
+                title="Elbow Method"
+            )
+            fig_elbow.update_layout(height=420, margin=dict(l=10, r=10, t=50, b=10))
+            st.plotly_chart(fig_elbow, use_container_width=True)
+
+        with colB:
+            fig_sil = px.line(
+                x=k_sil, y=sil_scores, markers=True,
+                labels={"x": "Jumlah Cluster (k)", "y": "Silhouette Score"},
+                title="Silhouette Score"
+            )
+            fig_sil.update_layout(height=420, margin=dict(l=10, r=10, t=50, b=10))
+            st.plotly_chart(fig_sil, use_container_width=True)
+            if sweep["sil_info"]:
+                st.caption(f"Silhouette dihitung dengan {describe_silhouette(sweep['sil_info'][0])}.")
+
+    if report["stability"] is not None:
+        st.write("**Stabilitas antar seed (sweep paralel):**")
+        stability_df = pd.DataFrame.from_dict(report["stability"], orient="index")
+        stability_df.index.name = "k"
+        st.dataframe(stability_df.round(4), use_container_width=True)
+
+    if sil_scores:
+        best_k = k_sil[int(np.argmax(sil_scores))]
+        best_sil = float(np.max(sil_scores))
+        best_text = f"**k = {best_k}** (score **{best_sil:.3f}**)"
+    else:
+        best_text = "tidak tersedia (silhouette belum dihitung untuk k mana pun)"
 
     st.info(
         f"- Elbow: cari titik “siku” saat penurunan inertia mulai melambat.\n"
         f"- Silhouette: semakin tinggi semakin baik.\n"
-        f"- Kandidat terbaik (silhouette tertinggi): **k = {best_k}** (score **{best_sil:.3f}**)."
+        f"- Kandidat terbaik (silhouette tertinggi): {best_text}."
     )
     st.markdown("---")
 
@@ -172,14 +179,20 @@ def ml_model():
     # =========================================================
     st.write("### 5. Training Model KMeans Final")
 
-    FINAL_K = 2  # fixed
-    kmeans_final = KMeans(n_clusters=FINAL_K, random_state=42, n_init=10)
-    final_labels = kmeans_final.fit_predict(X)
-
-    df_result = df_clean_safe.copy()
-    df_result["cluster"] = final_labels
-
-    st.success(f"✅ Training KMeans dengan k = {FINAL_K}")
+    # fixed: FINAL_K = 2 (lihat pipeline.py), model k=2 sudah di-fit di sweep -> pakai ulang.
+    # otomatis: model final = k terpilih (fit ulang dengan n_init penuh di select_k)
+    final_labels = report["labels"]
+
+    st.success(f"✅ Training KMeans dengan k = {final_k}")
+    selection = report["selection"]
+    if selection is not None:
+        if selection.get("k_criterion", selection["k"]) != selection["k"]:
+            st.warning(f"Kriteria {selection['criterion']} memilih k = {selection['k_criterion']} "
+                       f"(tidak ada struktur cluster yang jelas); model final memakai k = {selection['k']}.")
+        st.caption(
+            f"k dipilih otomatis ({selection['criterion']}, knee di k={selection['k_knee']}), berhenti di "
+            f"k={selection['stopped_at']} dari maksimum {selection['k_max']}: {describe_fits(selection)}."
+        )
     st.markdown("---")
 
     # =========================================================
@@ -187,19 +200,22 @@ def ml_model():
     # =========================================================
     st.write("### 6. Distribusi Cluster")
 
-    cluster_count = df_result["cluster"].value_counts().sort_index().reset_index()
-    cluster_count.columns = ["cluster", "jumlah_siswa"]
-
-    fig_cluster = px.pie(
-        cluster_count,
-        names="cluster",
-        values="jumlah_siswa",
-        hole=0.45,
-        title="Proporsi Jumlah Siswa per Cluster"
-    )
-    fig_cluster.update_layout(height=420, margin=dict(l=10, r=10, t=60, b=10))
-    st.plotly_chart(fig_cluster, use_container_width=True)
-    st.dataframe(cluster_count, use_container_width=True)
+    with span("ml.7_cluster_distribution"):
+        cluster_count = pd.DataFrame({
+            "cluster": np.arange(final_k),
+            "jumlah_siswa": report["cluster_sizes"],
+        })
+
+        fig_cluster = px.pie(
+            cluster_count,
+            names="cluster",
+            values="jumlah_siswa",
+            hole=0.45,
+            title="Proporsi Jumlah Siswa per Cluster"
+        )
+        fig_cluster.update_layout(height=420, margin=dict(l=10, r=10, t=60, b=10))
+        st.plotly_chart(fig_cluster, use_container_width=True)
+        st.dataframe(cluster_count, use_container_width=True)
     st.markdown("---")
 
     # =========================================================
@@ -207,8 +223,11 @@ def ml_model():
     # =========================================================
     st.write("### 7. Profiling Cluster (Rata-rata Fitur per Cluster)")
 
-    profile_mean = df_result.groupby("cluster").mean(numeric_only=True).round(2)
-    st.dataframe(profile_mean, use_container_width=True)
+    profile = report["profile"]
+    stat_tabs = st.tabs(list(PROFILE_STATS.values()))
+    for tab, stat in zip(stat_tabs, PROFILE_STATS):
+        with tab:
+            st.dataframe(profile[stat].round(2), use_container_width=True)
 
     st.info(
     "🔹 **Low Interest – Passive Students**\n\n"
@@ -235,27 +254,17 @@ def ml_model():
     # =========================================================
     st.write("### 8. Top Minat per Cluster")
 
-    interest_cols = [
-        'dance', 'band', 'marching', 'music', 'rock', 'hair', 'dress', 'blonde',
-        'basketball', 'football', 'soccer', 'softball', 'volleyball',
-        'swimming', 'cheerleading', 'baseball', 'tennis', 'sports'
-    ]
-    interest_cols = [c for c in interest_cols if c in df_result.columns]
-
-    if len(interest_cols) > 0:
-        top_rows = []
-        for c in sorted(df_result["cluster"].unique()):
-            means = df_result[df_result["cluster"] == c][interest_cols].mean().sort_values(ascending=False)
-            top3 = means.head(3)
-
-            top_rows.append({
-                "cluster": int(c),
-                "Top 1": f"{top3.index[0]} ({top3.iloc[0]:.2f})",
-                "Top 2": f"{top3.index[1]} ({top3.iloc[1]:.2f})",
-                "Top 3": f"{top3.index[2]} ({top3.iloc[2]:.2f})",
-            })
-
-        top_df = pd.DataFrame(top_rows)
+    n_interest = len(interest_columns(profile))
+    col_n, col_stat = st.columns(2)
+    with col_n:
+        top_n = st.number_input("Jumlah top minat", min_value=1, max_value=max(n_interest, 1),
+                                value=min(TOP_N_INTEREST, max(n_interest, 1)), step=1)
+    with col_stat:
+        top_stat = st.selectbox("Urutkan berdasarkan", ["mean", "lift", "active_share", "median"],
+                                format_func=PROFILE_STATS.get)
+
+    top_df = top_interests(profile, n=int(top_n), stat=top_stat)
+    if top_df is not None:
         st.dataframe(top_df, use_container_width=True)
     else:
         st.warning("Kolom minat tidak ditemukan untuk profiling top minat.")
@@ -266,40 +275,52 @@ def ml_model():
     # =========================================================
     st.write("### 9. Visualisasi Cluster (PCA 2D)")
 
-    pca = PCA(n_components=2, random_state=42)
-    X_pca = pca.fit_transform(X)
-
-    pca_df = pd.DataFrame(X_pca, columns=["PC1", "PC2"], index=df_scaled.index)
-    pca_df["cluster"] = final_labels
-
-    fig_pca = px.scatter(
-        pca_df,
-        x="PC1",
-        y="PC2",
-        color="cluster",
-        title="Visualisasi Cluster dengan PCA (2D)",
-        opacity=0.75
-    )
-    fig_pca.update_layout(height=520, margin=dict(l=10, r=10, t=60, b=10))
-    st.plotly_chart(fig_pca, use_container_width=True)
+    with span("ml.10_pca_figure"):
+        pca_df = pd.DataFrame(report["pca"], columns=["PC1", "PC2"])
+        pca_df["cluster"] = final_labels
+
+        fig_pca, pca_mode = scatter_auto(
+            pca_df,
+            x="PC1",
+            y="PC2",
+            color="cluster",
+            title="Visualisasi Cluster dengan PCA (2D)",
+            opacity=0.75
+        )
+        fig_pca.update_layout(height=520, margin=dict(l=10, r=10, t=60, b=10))
+        st.plotly_chart(fig_pca, use_container_width=True)
 
+    explained = report["explained_variance"]
     st.caption(
-        f"Explained Variance Ratio: PC1={pca.explained_variance_ratio_[0]:.2f}, "
-        f"PC2={pca.explained_variance_ratio_[1]:.2f}"
+        f"Explained Variance Ratio: PC1={explained[0]:.2f}, "
+        f"PC2={explained[1]:.2f} · {render_caption(pca_mode, len(pca_df))}"
     )
     st.markdown("---")
 
     # =========================================================
-    # 11) Evaluasi dengan Silhouette Score (FINAL_K)
+    # 11) Evaluasi dengan Silhouette Score (k final)
     # =========================================================
     st.write("### 10. Evaluasi Cluster")
 
-    silhouette_avg = silhouette_score(X, final_labels)
-    st.metric("Silhouette Score (k=2)", f"{silhouette_avg:.3f}")
-
-    # Save PKL 
-    import joblib
-    joblib.dump(kmeans_final, "Finpro_model.pkl")
-    joblib.dump(scaler, "Finpro_scaler.pkl")
-    joblib.dump(used_cols, "Finpro_used_cols.pkl")
-    joblib.dump(used_cols, "Finpro_features.pkl")
+    if final_k in sweep["k_sil"]:
+        sil_final = sweep["sil_info"][sweep["k_sil"].index(final_k)]
+        st.metric(f"Silhouette Score (k={final_k})", f"{sil_final['score']:.3f}")
+        st.caption(f"Dihitung dengan {describe_silhouette(sil_final)}.")
+    else:
+        st.warning(f"Silhouette untuk k={final_k} tidak tersedia di hasil sweep.")
+    st.caption("Hasil diambil dari cache (dihitung sebelumnya untuk versi dataset & konfigurasi ini)."
+               if cached else
+               f"Stage yang dihitung ulang: {', '.join(report['recomputed'])}; stage lain diambil dari "
+               "cache dan semuanya disimpan untuk sesi berikutnya.")
+
+    # Model untuk Prediction App TIDAK disimpan dari halaman ini lagi.
+    # Training offline: `python train.py` -> bundle berversi di artifacts/
+    manifest = latest_manifest()
+    if manifest is not None:
+        st.caption(
+            f"Model aktif di Prediction App: bundle **{manifest['version']}** "
+            f"(k={manifest['k']}, {manifest['data']['rows']:,} baris, dibuat {manifest['created_at']})."
+        )
+    else:
+        st.caption("Prediction App memakai file Finpro_*.pkl bawaan. "
+                   "Jalankan `python train.py` untuk membuat bundle baru.")
@@ -0,0 +1,42 @@
+import threading
+from collections import OrderedDict
+
+# =========================
+# Memo LRU kecil di memori proses (thread-safe)
+# =========================
+# Dipakai bersama oleh sweep model, filter korelasi dan result_cache. Nilai None
+# tidak disimpan (get -> None berarti miss).
+
+
+class LRUMemo:
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+        return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,132 @@
+import numpy as np
+
+from evaluation import DEFAULT_SAMPLE_SIZE
+from features import ARTS_COLS, SPORTS_COLS
+from model_selection import select_k, sweep_kmeans
+from pipeline_dag import PipelineDAG, Stage
+from profiling import cluster_profile, top_n_table
+from projection import fit_projection
+from pipeline import (CORR_THRESHOLD, FINAL_K, K_VALUES, N_INIT, RANDOM_STATE, SWEEP_N_JOBS, ZERO_RATIO_MAX,
+                      correlation_filter, fit_scaler, prepare_features, scale_columns, scaled_preview)
+
+# =========================
+# Hasil hitungan tab Machine Learning (tanpa figure)
+# =========================
+# Pipeline tab = DAG stage (lihat pipeline_dag.py):
+#   dataset -> clean -> scale ─┐
+#                 └-> correlation -> used_cols -> matrix -> sweep -> final_fit -> profile
+#                                                      └-> pca
+# Tiap stage di-cache per fingerprint input-nya; ganti metode silhouette hanya
+# menghitung ulang sweep (profil & PCA tetap dari cache kalau label sama).
+# Figure Plotly dibuat ulang per request dari hasil ini.
+REPORT_SCHEMA = 7
+TOP_N_INTEREST = 3
+
+
+def interest_columns(profile):
+    return [c for c in ARTS_COLS + SPORTS_COLS if c in profile["mean"].columns]
+
+
+def top_interests(profile, n=TOP_N_INTEREST, stat="mean"):
+    # dihitung dari profil yang sudah di-cache, jadi N / statistik bisa diganti tanpa retrain
+    interest_cols = interest_columns(profile)
+    if not interest_cols:
+        return None
+    return top_n_table(profile[stat], interest_cols, n)
+
+
+def _correlation(df_clean, threshold, zero_ratio_max):
+    return correlation_filter(df_clean, threshold=threshold, zero_ratio_max=zero_ratio_max)
+
+
+def _sweep(X, k_select, k_values, final_k, random_state, n_init, sil_method, sil_sample_size, n_jobs):
+    if k_select == "fixed":
+        sweep = sweep_kmeans(X, k_values=k_values, random_state=random_state, n_init=n_init,
+                             sil_method=sil_method, sil_sample_size=sil_sample_size, n_jobs=n_jobs)
+        return dict(sweep, k=final_k)
+    # adaptif: sekuensial (warm start dari k-1), n_jobs tidak dipakai
+    return select_k(X, criterion=k_select, k_max=max(k_values), random_state=random_state,
+                    n_init=n_init, sil_method=sil_method, sil_sample_size=sil_sample_size)
+
+
+def _final_fit(sweep):
+    # label model final (digest isi: sweep dihitung ulang dengan label sama -> profil tetap dari cache)
+    k = sweep["k"]
+    model = sweep["models"].get(k, sweep.get("model"))
+    if model is None:
+        raise ValueError(f"Model untuk k = {k} tidak ada di hasil sweep.")
+    return {"k": k, "labels": model.labels_.astype(np.int16)}
+
+
+def _profile(df_clean, final):
+    # mean, median, share aktif, jumlah & lift dalam satu pass terurut per label
+    return cluster_profile(df_clean.to_numpy(copy=False), final["labels"], df_clean.columns, k=final["k"])
+
+
+def _pca(X):
+    # komponen disimpan (proyeksi titik baru), embedding ikut di-cache
+    projection = fit_projection(X)
+    return {"projection": projection, "embedding": projection.transform(X)}
+
+
+def build_dag(df, version, sil_method="auto", sil_sample_size=DEFAULT_SAMPLE_SIZE, n_jobs=SWEEP_N_JOBS,
+              k_select="fixed"):
+    # select_k tidak memakai n_jobs -> tidak ikut key stage sweep (ganti n_jobs tetap cache hit)
+    if k_select != "fixed":
+        n_jobs = SWEEP_N_JOBS
+    stages = [
+        Stage("clean", prepare_features, ["dataset"], persist=False, digest="input"),
+        Stage("scale", fit_scaler, ["clean"], digest="input"),
+        Stage("correlation", _correlation, ["clean"],
+              params={"threshold": CORR_THRESHOLD, "zero_ratio_max": ZERO_RATIO_MAX}),
+        Stage("used_cols", lambda corr: corr["used_cols"], ["correlation"], persist=False),
+        Stage("matrix", scale_columns, ["scale", "clean", "used_cols"], persist=False, digest="input"),
+        Stage("sweep", _sweep, ["matrix"], digest="input", params={
+            "k_select": k_select, "k_values": list(K_VALUES), "final_k": FINAL_K,
+            "random_state": RANDOM_STATE, "n_init": N_INIT, "sil_method": sil_method,
+            "sil_sample_size": int(sil_sample_size), "n_jobs": int(n_jobs),
+        }),
+        Stage("final_fit", _final_fit, ["sweep"]),
+        Stage("profile", _profile, ["clean", "final_fit"], digest="input"),
+        Stage("pca", _pca, ["matrix"], digest="input"),
+    ]
+    return PipelineDAG(stages, {"dataset": (df, version)}, schema=REPORT_SCHEMA)
+
+
+# (report, dari_cache): dipakai bersama semua sesi & bertahan saat server restart
+def load_features_report(df, version):
+    # bagian 1-3 tab: normalisasi & filter korelasi (tidak tergantung pilihan silhouette)
+    dag = build_dag(df, version)
+    cached = dag.fresh(["scale", "correlation"])
+    df_clean, corr = dag.value("clean"), dag.value("correlation")
+    report = {
+        "rows": int(len(df_clean)),
+        "scaled_preview": scaled_preview(dag.value("scale"), df_clean),
+        "corr_columns": corr["corr_columns"],
+        "corr_filtered": corr["corr_filtered"],
+        "used_cols": corr["used_cols"],
+    }
+    return report, cached
+
+
+def load_cluster_report(df, version, sil_method="auto", sil_sample_size=DEFAULT_SAMPLE_SIZE,
+                        n_jobs=SWEEP_N_JOBS, k_select="fixed"):
+    # bagian 4-10 tab: sweep, model final, profiling, top minat, PCA
+    dag = build_dag(df, version, sil_method, sil_sample_size, n_jobs, k_select)
+    cached = dag.fresh(["sweep", "final_fit", "profile", "pca"])
+    sweep, final = dag.value("sweep"), dag.value("final_fit")
+    profile, pca = dag.value("profile"), dag.value("pca")
+    report = {
+        "sweep": {key: sweep[key] for key in ("k_elbow", "inertias", "k_sil", "sil_scores", "sil_info")},
+        "stability": sweep.get("stability"),
+        "final_k": final["k"],
+        "selection": sweep.get("selection"),
+        "cluster_sizes": profile["count"].to_numpy(),
+        "profile": profile,
+        "pca": pca["embedding"],
+        "labels": final["labels"],
+        "explained_variance": pca["projection"].explained_variance_ratio,
+        "projection": pca["projection"],
+        "recomputed": list(dag.recomputed),
+    }
+    return report, cached
@@ -0,0 +1,288 @@
+import hashlib
+
+import numpy as np
+from sklearn.cluster import KMeans
+
+from evaluation import DEFAULT_SAMPLE_SIZE, silhouette
+from instrumentation import span
+from memo import LRUMemo
+
+# memo hasil sweep: key = (hash matriks fitur, hyperparameter)
+_MEMO_SIZE = 8
+_MEMO = LRUMemo(_MEMO_SIZE)
+
+
+def matrix_fingerprint(X):
+    X = np.ascontiguousarray(X)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str((X.shape, X.dtype.str)).encode())
+    h.update(memoryview(X).cast("B"))
+    return h.hexdigest()
+
+
+def clear_memo():
+    # dipakai benchmark supaya setiap pengukuran benar-benar menghitung ulang
+    _MEMO.clear()
+
+
+def sweep_kmeans(X, k_values=range(1, 11), random_state=42, n_init=10,
+                 sil_method="auto", sil_sample_size=DEFAULT_SAMPLE_SIZE, n_jobs=1):
+    # Fit KMeans sekali per k, lalu hasilnya dipakai ulang untuk
+    # elbow (inertia), silhouette (label) dan model final.
+    # n_jobs > 1: tiap (k, seed) di-fit paralel di process pool (lihat parallel_sweep.py),
+    # n_init diganti n_init seed berbeda -> sekaligus dapat metrik stabilitas.
+    k_values = sorted(set(int(k) for k in k_values))
+    parallel = n_jobs is None or n_jobs > 1
+    key = (matrix_fingerprint(X), tuple(k_values), random_state, n_init,
+           sil_method, sil_sample_size, parallel)
+
+    cached = _MEMO.get(key)
+    if cached is not None:
+        return cached
+
+    if parallel:
+        from parallel_sweep import parallel_sweep
+        with span("sweep.parallel"):
+            result = parallel_sweep(X, k_values, seeds=[random_state + i for i in range(n_init)],
+                                    n_jobs=n_jobs, sil_method=sil_method, sil_sample_size=sil_sample_size)
+        _MEMO.put(key, result)
+        return result
+
+    models = {}
+    inertias = []
+    k_sil = []
+    sil_scores = []
+    sil_info = []
+    for k in k_values:
+        with span(f"sweep.kmeans_fit k={k}"):
+            km = KMeans(n_clusters=k, random_state=random_state, n_init=n_init)
+            km.fit(X)
+        models[k] = km
+        inertias.append(float(km.inertia_))
+
+        # silhouette hanya valid untuk 2 <= k < n_sampel
+        if 2 <= k < len(X):
+            with span(f"sweep.silhouette k={k}"):
+                info = silhouette(X, km.labels_, method=sil_method, sample_size=sil_sample_size,
+                                  random_state=random_state, centroids=km.cluster_centers_)
+            k_sil.append(k)
+            sil_scores.append(info["score"])
+            sil_info.append(info)
+
+    result = {
+        "k_elbow": k_values,
+        "inertias": inertias,
+        "k_sil": k_sil,
+        "sil_scores": sil_scores,
+        "sil_info": sil_info,
+        "models": models,
+    }
+    _MEMO.put(key, result)
+    return result
+
+
+# =========================
+# Pemilihan k otomatis (warm start + early stopping)
+# =========================
+# k dinaikkan satu per satu; centroid k-1 dipakai ulang + satu centroid baru
+# (langkah k-means++), jadi tiap k cukup satu fit Lloyd. Berhenti begitu
+# kriteria tidak membaik lagi, bukan di batas atas k yang tetap.
+K_SELECTION_MODES = {
+    "fixed": "Tetap (sweep semua k, k final = FINAL_K)",
+    "silhouette": "Otomatis: silhouette + kneedle, berhenti saat plateau",
+    "gap": "Otomatis: gap statistic (Tibshirani), berhenti di k pertama yang lolos",
+}
+AUTO_K_MAX = 10
+AUTO_K_PATIENCE = 2        # jumlah k berturut-turut tanpa perbaikan sebelum berhenti
+AUTO_K_TOL = 0.005         # perbaikan silhouette minimum yang dihitung
+GAP_REFERENCES = 5         # dataset referensi uniform per k
+
+
+def kneedle(k_values, inertias):
+    # knee kurva inertia (turun & konveks): setelah x dan y dinormalisasi ke [0, 1],
+    # titik dengan jarak terbesar di atas diagonal; None kalau kurva belum menekuk
+    x = np.asarray(k_values, dtype=np.float64)
+    y = np.asarray(inertias, dtype=np.float64)
+    if len(x) < 3 or y.max() == y.min():
+        return None
+    diff = (1.0 - (y - y.min()) / (y.max() - y.min())) - (x - x[0]) / (x[-1] - x[0])
+    i = int(np.argmax(diff))
+    return int(x[i]) if 0 < i < len(x) - 1 and diff[i] > 0 else None
+
+
+def _next_center(X, centers, rng, n_candidates=None):
+    # satu langkah k-means++ (greedy): kandidat diambil ∝ D², pilih yang paling
+    # menurunkan total jarak kuadrat ke centroid terdekat
+    d2 = np.full(len(X), np.inf)
+    for c in centers.astype(X.dtype):
+        np.minimum(d2, ((X - c) ** 2).sum(axis=1), out=d2)
+    total = d2.sum()
+    if total <= 0:
+        return X[rng.integers(len(X))]
+    n_candidates = n_candidates or 2 + int(np.log(len(centers) + 1))
+    candidates = rng.choice(len(X), size=n_candidates, p=d2 / total)
+    best, best_pot = None, np.inf
+    for idx in candidates:
+        pot = np.minimum(d2, ((X - X[idx]) ** 2).sum(axis=1)).sum()
+        if pot < best_pot:
+            best, best_pot = idx, pot
+    return X[best]
+
+
+def _log_wk(X, labels, centers):
+    return float(np.log(max(((X - centers[labels]) ** 2).sum(), 1e-12)))
+
+
+def _gap(X_sample, km, k, refs, random_state):
+    # gap(k) = E[log W_k referensi] - log W_k data (di sampel); referensi uniform di bounding box
+    labels = km.predict(X_sample) if k > 1 else np.zeros(len(X_sample), dtype=int)
+    centers = km.cluster_centers_ if k > 1 else X_sample.mean(axis=0, keepdims=True)
+    log_w = _log_wk(X_sample, labels, centers.astype(X_sample.dtype))
+    ref_logs = []
+    for ref in refs:
+        if k == 1:
+            ref_logs.append(_log_wk(ref, np.zeros(len(ref), dtype=int), ref.mean(axis=0, keepdims=True)))
+        else:
+            ref_km = KMeans(n_clusters=k, n_init=1, random_state=random_state).fit(ref)
+            ref_logs.append(float(np.log(max(ref_km.inertia_, 1e-12))))
+    ref_logs = np.asarray(ref_logs)
+    return float(ref_logs.mean() - log_w), float(ref_logs.std() * np.sqrt(1.0 + 1.0 / len(refs)))
+
+
+def select_k(X, criterion="silhouette", k_max=AUTO_K_MAX, random_state=42, n_init=10,
+             sil_method="sampled", sil_sample_size=DEFAULT_SAMPLE_SIZE, patience=AUTO_K_PATIENCE,
+             tol=AUTO_K_TOL, refit=True):
+    # Hasil berformat sama dengan sweep_kmeans (k_elbow, inertias, k_sil, ...) + k terpilih,
+    # model final & jumlah fit yang dihemat dibanding sweep penuh k = 1..k_max × n_init.
+    if criterion not in ("silhouette", "gap"):
+        raise ValueError(f"Kriteria pemilihan k tidak dikenal: {criterion}")
+    k_max = int(min(k_max, len(X) - 1))
+    if k_max < 2:
+        raise ValueError("Pemilihan k butuh minimal 3 baris data.")
+    key = ("select_k", matrix_fingerprint(X), criterion, k_max, random_state, n_init,
+           sil_method, sil_sample_size, patience, tol, refit)
+    cached = _MEMO.get(key)
+    if cached is not None:
+        return cached
+
+    rng = np.random.default_rng(random_state)
+    # k = 1 tanpa fit: centroid = mean, inertia = total jarak kuadrat ke mean
+    centers = X.mean(axis=0, dtype=np.float64)[None, :]
+    k_elbow, inertias = [1], [float(((X - centers.astype(X.dtype)) ** 2).sum(dtype=np.float64))]
+    k_sil, sil_scores, sil_info, gaps = [], [], [], []
+    models = {}
+    fits = ref_fits = 0
+
+    if criterion == "gap":
+        sample = X[rng.choice(len(X), size=min(sil_sample_size, len(X)), replace=False)]
+        lo, hi = sample.min(axis=0), sample.max(axis=0)
+        refs = [rng.uniform(lo, hi, size=sample.shape).astype(X.dtype) for _ in range(GAP_REFERENCES)]
+        gaps.append(_gap(sample, None, 1, refs, random_state))
+
+    k_best, best_score, since_best, knee = None, -np.inf, 0, None
+    for k in range(2, k_max + 1):
+        with span(f"select_k.warm_fit k={k}"):
+            init = np.vstack([centers, _next_center(X, centers, rng)[None, :]])
+            km = KMeans(n_clusters=k, init=init.astype(X.dtype), n_init=1, random_state=random_state).fit(X)
+        fits += 1
+        models[k] = km
+        centers = km.cluster_centers_.astype(np.float64)
+        k_elbow.append(k)
+        inertias.append(float(km.inertia_))
+        knee = kneedle(k_elbow, inertias)
+
+        if criterion == "gap":
+            with span(f"select_k.gap k={k}"):
+                gaps.append(_gap(sample, km, k, refs, random_state))
+            ref_fits += GAP_REFERENCES
+            # aturan Tibshirani: k terkecil dengan gap(k) >= gap(k+1) - s(k+1)
+            if gaps[-2][0] >= gaps[-1][0] - gaps[-1][1]:
+                k_best = k - 1
+                break
+            continue
+
+        with span(f"select_k.silhouette k={k}"):
+            info = silhouette(X, km.labels_, method=sil_method, sample_size=sil_sample_size,
+                              random_state=random_state, centroids=km.cluster_centers_)
+        k_sil.append(k)
+        sil_scores.append(info["score"])
+        sil_info.append(info)
+        if info["score"] > best_score + tol:
+            k_best, best_score, since_best = k, info["score"], 0
+        else:
+            since_best += 1
+        # plateau: silhouette tidak membaik `patience` kali dan knee sudah stabil di belakang
+        if since_best >= patience and knee is not None and knee <= k - patience:
+            break
+
+    if k_best is None:
+        # gap tidak pernah lolos sampai k_max -> k_max
+        k_best = k_elbow[-1]
+    k_criterion = k_best
+    if k_best < 2:
+        # gap memilih k = 1 (data tanpa struktur cluster): model final tetap butuh
+        # minimal 2 cluster, pilihan asli kriteria dicatat di "k_criterion"
+        k_best = 2
+
+    warm = final = models.get(k_best)
+    if refit:
+        # fit final dengan n_init penuh; model warm start dipakai kalau inertianya lebih kecil
+        with span(f"select_k.final_fit k={k_best}"):
+            cold = KMeans(n_clusters=k_best, random_state=random_state, n_init=n_init).fit(X)
+        fits += n_init
+        if final is None or cold.inertia_ < final.inertia_:
+            final = cold
+        models[k_best] = final
+
+    if k_best not in k_sil or final is not warm:
+        # silhouette k final dari model yang dipakai (mode gap belum punya; fit ulang
+        # cold menggantikan model warm start -> label berbeda, hitung ulang)
+        info = silhouette(X, final.labels_, method=sil_method, sample_size=sil_sample_size,
+                          random_state=random_state, centroids=final.cluster_centers_)
+        if k_best in k_sil:
+            i = k_sil.index(k_best)
+            sil_scores[i], sil_info[i] = info["score"], info
+        else:
+            k_sil.append(k_best)
+            sil_scores.append(info["score"])
+            sil_info.append(info)
+
+    # fit KMeans total (termasuk fit di data referensi gap) vs sweep penuh tanpa warm start
+    fits += ref_fits
+    baseline = k_max * n_init
+    result = {
+        "k_elbow": k_elbow,
+        "inertias": inertias,
+        "k_sil": k_sil,
+        "sil_scores": sil_scores,
+        "sil_info": sil_info,
+        "models": models,
+        "k": int(k_best),
+        "model": final,
+        "selection": {
+            "criterion": criterion,
+            "k": int(k_best),
+            "k_criterion": int(k_criterion),
+            "k_knee": knee,
+            "stopped_at": int(k_elbow[-1]),
+            "k_max": k_max,
+            "fits": fits,
+            "reference_fits": ref_fits,
+            "fits_baseline": baseline,
+            "fits_saved": baseline - fits,
+            "gap": [{"k": i + 1, "gap": g, "s": s} for i, (g, s) in enumerate(gaps)],
+        },
+    }
+    _MEMO.put(key, result)
+    return result
+
+
+def describe_fits(selection):
+    # teks biaya pemilihan k: fit di data referensi gap ikut dihitung, bukan "dihemat"
+    text = f"{selection['fits']} fit KMeans"
+    if selection["reference_fits"]:
+        text += f" (termasuk {selection['reference_fits']} fit di data referensi gap)"
+    text += f" vs {selection['fits_baseline']} untuk sweep penuh"
+    if selection["fits_saved"] >= 0:
+        return f"{text} ({selection['fits_saved']} fit dihemat)"
+    return f"{text} ({-selection['fits_saved']} fit lebih banyak)"
@@ -0,0 +1,97 @@
+import logging
+import os
+import threading
+import time
+
+from registry import LATEST_FILE, load_bundle, latest_version
+
+logger = logging.getLogger(__name__)
+
+# seberapa sering (detik) cek apakah ada bundle baru di artifacts/LATEST
+CHECK_INTERVAL = 2.0
+
+
+class ModelServer:
+    # Pemegang model level proses: bundle di-load sekali dan dipakai bersama
+    # oleh semua sesi Streamlit. Bundle baru di-load di thread background,
+    # divalidasi checksum, lalu di-swap; prediksi yang sedang jalan tetap
+    # memakai snapshot lama (dict bundle tidak pernah diubah setelah dibuat).
+
+    def __init__(self, check_interval=CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._bundle = None
+        self._load_lock = threading.Lock()
+        self._loading = False
+        self._last_check = 0.0
+        self._latest_mtime = None
+        self._rejected = set()
+
+    def get(self):
+        bundle = self._bundle
+        if bundle is None:
+            return self._load_initial()
+
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            self._maybe_reload(bundle)
+        return bundle
+
+    def _load_initial(self):
+        with self._load_lock:
+            if self._bundle is None:
+                self._latest_mtime = self._stat_latest()
+                self._bundle = self._load(latest_version())
+                self._last_check = time.monotonic()
+            return self._bundle
+
+    def _stat_latest(self):
+        try:
+            return os.stat(LATEST_FILE).st_mtime_ns
+        except OSError:
+            return None
+
+    def _maybe_reload(self, current):
+        # stat murah dulu; baca isi LATEST hanya kalau mtime berubah
+        mtime = self._stat_latest()
+        if mtime == self._latest_mtime:
+            return
+        version = latest_version()
+        if version is None or version == current["version"] or version in self._rejected:
+            self._latest_mtime = mtime
+            return
+
+        with self._load_lock:
+            if self._loading:
+                return
+            self._loading = True
+        threading.Thread(target=self._reload, args=(version, mtime), daemon=True).start()
+
+    def _load(self, version):
+        return load_bundle(version, verify=version is not None)
+
+    def _reload(self, version, mtime):
+        try:
+            bundle = self._load(version)
+        except Exception:
+            logger.exception("Bundle %s ditolak, tetap memakai bundle lama.", version)
+            self._rejected.add(version)
+        else:
+            self._bundle = bundle
+            logger.info("Model di-swap ke bundle %s.", version)
+        finally:
+            self._latest_mtime = mtime
+            self._loading = False
+
+
+_SERVER = None
+_SERVER_LOCK = threading.Lock()
+
+
+def get_model_server():
+    global _SERVER
+    if _SERVER is None:
+        with _SERVER_LOCK:
+            if _SERVER is None:
+                _SERVER = ModelServer()
+    return _SERVER
@@ -0,0 +1,171 @@
+import atexit
+import itertools
+import multiprocessing as mp
+import os
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.metrics import adjusted_rand_score
+
+from evaluation import DEFAULT_SAMPLE_SIZE, silhouette
+
+# =========================
+# Sweep KMeans paralel (k × seed) di process pool
+# =========================
+# X ditulis sekali ke file memmap (di /dev/shm kalau ada) dan setiap worker
+# membuka file yang sama secara read-only -> X tidak di-pickle ke tiap task.
+# Satu pool per proses (ukuran = jumlah core); n_jobs tiap sweep hanya membatasi
+# jumlah task yang berjalan bersamaan, jadi ganti n_jobs tidak membuat pool baru.
+STABILITY_SAMPLE = 5_000
+POOL_MAX_WORKERS = os.cpu_count() or 1
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+# state di proses worker
+_WORKER_ARRAYS = {}
+_WORKER_LIMITS = None
+
+
+def _shm_dir():
+    return "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+
+def _worker_init():
+    # 1 thread BLAS/OpenMP per proses supaya tidak oversubscribe core
+    global _WORKER_LIMITS
+    from threadpoolctl import threadpool_limits
+    _WORKER_LIMITS = threadpool_limits(limits=1)
+
+
+def _attach(path, shape, dtype):
+    X = _WORKER_ARRAYS.get(path)
+    if X is None:
+        X = np.memmap(path, mode="r", dtype=dtype, shape=shape)
+        _WORKER_ARRAYS.clear()   # hanya simpan memmap sweep yang sedang jalan
+        _WORKER_ARRAYS[path] = X
+    return X
+
+
+def _fit_task(path, shape, dtype, k, seed, n_init, sample_idx):
+    X = _attach(path, shape, dtype)
+    km = KMeans(n_clusters=k, random_state=seed, n_init=n_init).fit(X)
+
+    # silhouette per seed pakai versi simplified O(n·k) -> murah untuk metrik stabilitas
+    sil = None
+    if 2 <= k < shape[0]:
+        sil = silhouette(X, km.labels_, method="simplified", centroids=km.cluster_centers_)["score"]
+    return {
+        "k": k,
+        "seed": seed,
+        "inertia": float(km.inertia_),
+        "silhouette": sil,
+        "centers": km.cluster_centers_,
+        "sample_labels": km.labels_[sample_idx].astype(np.int16),
+    }
+
+
+def _get_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # spawn: aman dipanggil dari thread Streamlit (tidak fork proses yang punya thread);
+            # worker dibuat saat dibutuhkan, jadi n_jobs kecil hanya memakai sedikit proses
+            _POOL = ProcessPoolExecutor(max_workers=POOL_MAX_WORKERS, mp_context=mp.get_context("spawn"),
+                                        initializer=_worker_init)
+        return _POOL
+
+
+@atexit.register
+def _shutdown_pool():
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+
+
+def _map_limited(pool, fn, calls, limit):
+    # maksimal `limit` task sweep ini berjalan bersamaan; hasil urut sesuai `calls`
+    results = [None] * len(calls)
+    pending = {}
+    for i, args in enumerate(calls):
+        if len(pending) >= limit:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = future.result()
+        pending[pool.submit(fn, *args)] = i
+    for future, i in pending.items():
+        results[i] = future.result()
+    return results
+
+
+def _stability(runs):
+    inertias = np.array([r["inertia"] for r in runs])
+    sils = np.array([r["silhouette"] for r in runs if r["silhouette"] is not None])
+    aris = [adjusted_rand_score(a["sample_labels"], b["sample_labels"])
+            for a, b in itertools.combinations(runs, 2)]
+    return {
+        "n_seeds": len(runs),
+        "inertia_mean": float(inertias.mean()),
+        "inertia_std": float(inertias.std()),
+        "inertia_cv": float(inertias.std() / inertias.mean()) if inertias.mean() > 0 else 0.0,
+        "simplified_silhouette_mean": float(sils.mean()) if len(sils) else None,
+        "simplified_silhouette_std": float(sils.std()) if len(sils) else None,
+        "ari_mean": float(np.mean(aris)) if aris else None,
+    }
+
+
+def parallel_sweep(X, k_values, seeds, n_jobs=None, n_init=1, sil_method="auto",
+                   sil_sample_size=DEFAULT_SAMPLE_SIZE, stability_sample=STABILITY_SAMPLE):
+    # Hasil berformat sama dengan model_selection.sweep_kmeans + "stability" per k.
+    n_jobs = min(n_jobs or POOL_MAX_WORKERS, POOL_MAX_WORKERS)
+    X = np.ascontiguousarray(X)
+    k_values = sorted(set(int(k) for k in k_values))
+    seeds = list(seeds)
+
+    rng = np.random.default_rng(seeds[0])
+    sample_idx = np.sort(rng.choice(len(X), size=min(stability_sample, len(X)), replace=False))
+
+    fd, path = tempfile.mkstemp(prefix="sweep-", suffix=".bin", dir=_shm_dir())
+    os.close(fd)
+    try:
+        mm = np.memmap(path, mode="w+", dtype=X.dtype, shape=X.shape)
+        mm[:] = X
+        mm.flush()
+        del mm
+
+        # k besar dulu (paling lama) supaya beban antar worker lebih rata
+        calls = [(path, X.shape, X.dtype.str, k, seed, n_init, sample_idx)
+                 for k in sorted(k_values, reverse=True) for seed in seeds]
+        runs = _map_limited(_get_pool(), _fit_task, calls, n_jobs)
+    finally:
+        os.remove(path)
+
+    by_k = {k: [r for r in runs if r["k"] == k] for k in k_values}
+
+    models, inertias, k_sil, sil_scores, sil_info, stability = {}, [], [], [], [], {}
+    for k in k_values:
+        best = min(by_k[k], key=lambda r: r["inertia"])
+        # model final: mulai dari centroid seed terbaik (konvergen dalam 1-2 iterasi)
+        km = KMeans(n_clusters=k, init=best["centers"], n_init=1).fit(X)
+        models[k] = km
+        inertias.append(float(km.inertia_))
+        if 2 <= k < len(X):
+            # silhouette utama (metode pilihan) hanya untuk model terbaik per k
+            info = silhouette(X, km.labels_, method=sil_method, sample_size=sil_sample_size,
+                              random_state=seeds[0], centroids=km.cluster_centers_)
+            k_sil.append(k)
+            sil_scores.append(info["score"])
+            sil_info.append(info)
+        stability[k] = _stability(by_k[k])
+
+    return {
+        "k_elbow": k_values,
+        "inertias": inertias,
+        "k_sil": k_sil,
+        "sil_scores": sil_scores,
+        "sil_info": sil_info,
+        "models": models,
+        "stability": stability,
+    }
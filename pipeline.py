@@ -0,0 +1,132 @@
+import copy
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+import feature_selection
+from evaluation import DEFAULT_SAMPLE_SIZE
+from features import BASE_COLS, DEFAULT_TRANSFORM
+from instrumentation import Stopwatch
+from model_selection import select_k, sweep_kmeans
+from projection import fit_projection
+
+# =========================
+# Konfigurasi pipeline (sama untuk dashboard & training offline)
+# =========================
+CORR_THRESHOLD = 0.80
+ZERO_RATIO_MAX = 0.99
+FINAL_K = 2
+K_VALUES = range(1, 11)
+RANDOM_STATE = 42
+N_INIT = 10
+SWEEP_N_JOBS = 1   # >1: sweep (k, seed) paralel di process pool
+
+
+def prepare_features(df, transform=DEFAULT_TRANSFORM, dtype=np.float32):
+    # layout fitur tetap dari FeatureTransform (outlier tetap dipakai, inf/NaN -> 0).
+    # Fitur turunan selalu dihitung ulang dari kolom minat, sama persis dengan prediksi.
+    # Hasil: satu matriks float32 (DataFrame satu blok, tanpa salinan) yang dipakai
+    # bersama oleh scaler, korelasi, profiling & PCA.
+    if not set(BASE_COLS) & set(df.columns):
+        raise ValueError("Dataset tidak punya kolom fitur siswa.")
+    return transform.transform_frame(df, dtype=dtype)
+
+
+def fit_scaler(df_clean):
+    # cukup statistik (mean_, scale_); matriks hasil scaling dibuat hanya untuk
+    # kolom yang dipakai KMeans lewat scale_columns()
+    return StandardScaler().fit(df_clean)
+
+
+def scale_columns(scaler, df_clean, cols):
+    # satu matriks float32 (n × len(cols)), di-scale in-place
+    names = list(scaler.feature_names_in_)
+    idx = [names.index(c) for c in cols]
+    X = df_clean.to_numpy()[:, idx]   # indexing -> salinan baru yang boleh ditulis
+    X -= scaler.mean_[idx].astype(X.dtype)
+    X /= scaler.scale_[idx].astype(X.dtype)
+    return X
+
+
+def scaled_preview(scaler, df_clean, n=10):
+    head = df_clean.head(n)
+    return pd.DataFrame(scaler.transform(head), columns=df_clean.columns, index=head.index)
+
+
+def _predict_ready(model):
+    # model di-fit di float32; KMeans.predict butuh centroid float64 untuk input
+    # float64 (prediksi & ingest) -> salinan dangkal dengan centroid float64
+    model = copy.copy(model)
+    model.cluster_centers_ = model.cluster_centers_.astype(np.float64)
+    return model
+
+
+def correlation_filter(df_clean, threshold=CORR_THRESHOLD, zero_ratio_max=ZERO_RATIO_MAX, version=None):
+    # satu matriks korelasi (float32, satu matmul) -> kolom drop, pasangan tinggi
+    # & heatmap diambil dengan indexing; di-cache per versi dataset
+    return feature_selection.correlation_filter(df_clean, threshold, zero_ratio_max, version=version)
+
+
+def train_pipeline(df, k=FINAL_K, k_values=K_VALUES, sil_method="auto",
+                   sil_sample_size=DEFAULT_SAMPLE_SIZE, random_state=RANDOM_STATE, n_init=N_INIT,
+                   n_jobs=SWEEP_N_JOBS, projection_method="auto", k_select="fixed"):
+    # pipeline headless: clean -> scale -> filter korelasi -> sweep -> model final
+    # k_select="silhouette"/"gap": k dipilih otomatis (warm start + early stopping), `k` diabaikan
+    watch = Stopwatch()
+    lap = watch.lap
+
+    df_clean = prepare_features(df)
+    lap("clean")
+
+    scaler = fit_scaler(df_clean)
+    lap("scale")
+
+    corr = correlation_filter(df_clean)
+    used_cols = corr["used_cols"]
+    if len(used_cols) < 2:
+        raise ValueError("Kolom yang tersisa untuk clustering kurang dari 2.")
+    lap("correlation")
+
+    X = scale_columns(scaler, df_clean, used_cols)
+    if k_select == "fixed":
+        k_values = sorted(set(k_values) | {k})
+        sweep = sweep_kmeans(X, k_values=k_values, random_state=random_state, n_init=n_init,
+                             sil_method=sil_method, sil_sample_size=sil_sample_size, n_jobs=n_jobs)
+    else:
+        sweep = select_k(X, criterion=k_select, k_max=max(k_values), random_state=random_state,
+                         n_init=n_init, sil_method=sil_method, sil_sample_size=sil_sample_size)
+        k = sweep["k"]
+    lap("sweep")
+
+    # komponen PCA 2D ikut disimpan di bundle (proyeksi siswa baru tanpa fit ulang)
+    projection = fit_projection(X, method=projection_method)
+    lap("projection")
+
+    model = sweep["models"][k]
+    sil = sweep["sil_info"][sweep["k_sil"].index(k)] if k in sweep["k_sil"] else None
+    metrics = {
+        "inertia": float(model.inertia_),
+        "silhouette": sil["score"] if sil else None,
+        "silhouette_method": sil["method"] if sil else None,
+        "silhouette_n": sil["n_used"] if sil else None,
+        "cluster_sizes": np.bincount(model.labels_, minlength=k).tolist(),
+        "elbow": dict(zip(sweep["k_elbow"], sweep["inertias"])),
+        "silhouette_by_k": dict(zip(sweep["k_sil"], sweep["sil_scores"])),
+    }
+    if "stability" in sweep:
+        metrics["stability"] = sweep["stability"]
+    if "selection" in sweep:
+        metrics["k_selection"] = sweep["selection"]
+
+    return {
+        "model": _predict_ready(model),
+        "scaler": scaler,
+        "used_cols": used_cols,
+        "transform": DEFAULT_TRANSFORM,
+        "projection": projection,
+        "metrics": metrics,
+        "timings": watch.timings,
+        "rows": int(len(df_clean)),
+        "k": k,
+    }
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+
+import result_cache
+from instrumentation import span
+
+# =========================
+# DAG stage pipeline dengan cache berbasis fingerprint
+# =========================
+# key stage = hash(nama, params, digest output tiap stage upstream). Output
+# disimpan di result_cache bersama digest isinya; kalau isi output upstream
+# tidak berubah (mis. threshold korelasi lain tapi kolom terpilih sama), stage
+# hilir tetap memakai cache (early cutoff). Stage dengan digest="input" tidak
+# di-hash isinya: digest = key input (fungsi deterministik, output besar).
+DAG_SCHEMA = 1
+_DIGEST_NAMESPACE = "dag-digest"
+
+
+def content_digest(value):
+    h = hashlib.blake2b(digest_size=16)
+    _update(h, value)
+    return h.hexdigest()
+
+
+def _update(h, value):
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        value = np.ascontiguousarray(value)
+        h.update(str((value.shape, value.dtype.str)).encode())
+        h.update(memoryview(value).cast("B"))
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(type(value).__name__.encode())
+        _update(h, [str(c) for c in (value.columns if isinstance(value, pd.DataFrame) else [value.name])])
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for key in sorted(value, key=str):
+            _update(h, str(key))
+            _update(h, value[key])
+        h.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        h.update(b"[")
+        for item in value:
+            _update(h, item)
+        h.update(b"]")
+    elif value is None or isinstance(value, (str, bool, int, float, np.generic)):
+        h.update(repr(value).encode())
+    else:
+        # objek lain (model sklearn, scaler, ...) -> isi pickle
+        h.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class Stage:
+
+    def __init__(self, name, fn, deps=(), params=None, persist=True, digest="content"):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.params = dict(params or {})
+        self.persist = persist
+        self.digest = digest
+
+
+class PipelineDAG:
+    # sources: {nama: (nilai, fingerprint)} untuk stage akar (mis. dataset + versi);
+    # schema: versi definisi stage milik pemanggil (naikkan kalau fungsi stage berubah)
+
+    def __init__(self, stages, sources, schema=0):
+        self.schema = schema
+        self.stages = {stage.name: stage for stage in stages}
+        self._values = {name: value for name, (value, _) in sources.items()}
+        self._digests = {name: str(fp) for name, (_, fp) in sources.items()}
+        self._keys = {}
+        self.recomputed = []
+
+    def key(self, name):
+        # fingerprint input stage (deterministik: params + digest upstream)
+        if name not in self._keys:
+            stage = self.stages[name]
+            payload = json.dumps({
+                "schema": [DAG_SCHEMA, self.schema],
+                "stage": name,
+                "params": stage.params,
+                "deps": {dep: self.digest(dep) for dep in stage.deps},
+            }, sort_keys=True, default=str)
+            self._keys[name] = hashlib.sha256(payload.encode()).hexdigest()[:32]
+        return self._keys[name]
+
+    def digest(self, name):
+        # digest output: dari sumber, dari index digest di cache, atau dari isi output stage
+        if name in self._digests:
+            return self._digests[name]
+        stage = self.stages[name]
+        key = self.key(name)
+        if stage.digest == "input":
+            self._digests[name] = key
+            return key
+        digest_key = result_cache.cache_key(_DIGEST_NAMESPACE, key, {})
+        digest = result_cache.get_index(digest_key)
+        if digest is None:
+            value = self.value(name)
+            if name in self._digests:
+                # stage baru dihitung: _run sudah menyimpan digest-nya
+                return self._digests[name]
+            # output dari cache tapi index digest hilang (mis. eviction) -> hash isinya saja
+            digest = content_digest(value)
+            result_cache.put_index(digest_key, digest)
+        self._digests[name] = digest
+        return digest
+
+    def value(self, name):
+        if name in self._values:
+            return self._values[name]
+        stage = self.stages[name]
+        if stage.persist:
+            # single-flight: sesi lain yang minta key sama menunggu hasil sesi pertama
+            value, _ = result_cache.get_or_compute(f"dag-{name}", self.key(name), {}, lambda: self._run(name))
+        else:
+            value = self._run(name)
+        self._values[name] = value
+        return value
+
+    def fresh(self, names):
+        # True kalau semua stage yang diminta bisa diambil dari cache (stage persist
+        # tidak ada yang dihitung ulang; stage murah tanpa persist tidak dihitung)
+        for name in names:
+            self.value(name)
+        return not self.recomputed
+
+    def _run(self, name):
+        stage = self.stages[name]
+        inputs = [self.value(dep) for dep in stage.deps]
+        with span(f"dag.{name}"):
+            value = stage.fn(*inputs, **stage.params)
+        if stage.persist:
+            self.recomputed.append(name)
+        if stage.digest != "input":
+            digest = content_digest(value)
+            self._digests[name] = digest
+            result_cache.put_index(result_cache.cache_key(_DIGEST_NAMESPACE, self.key(name), {}), digest)
+        return value
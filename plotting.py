@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+# =========================
+# Mode render scatter berdasarkan jumlah titik
+# =========================
+SVG_MAX_POINTS = 5_000       # <= ini: SVG biasa (interaktif penuh)
+WEBGL_MAX_POINTS = 50_000    # <= ini: WebGL; di atasnya: binning di server
+GRID_BINS = 120              # grid binning per sumbu -> payload maks GRID_BINS² per grup
+
+RENDER_MODE_LABELS = {
+    "svg": "SVG",
+    "webgl": "WebGL",
+    "binned": "binning grid di server",
+    "counts": "satu titik per nilai unik (dari aggregate store)",
+}
+
+
+def choose_render_mode(n_points):
+    if n_points <= SVG_MAX_POINTS:
+        return "svg"
+    if n_points <= WEBGL_MAX_POINTS:
+        return "webgl"
+    return "binned"
+
+
+def bin_points(x, y, groups=None, bins=GRID_BINS, weights=None):
+    # Hitung jumlah titik per sel grid (dan per grup/cluster) -> ukuran hasil
+    # maksimal bins² × jumlah grup, tidak tergantung jumlah baris.
+    # weights: jumlah per titik kalau input sudah berupa hitungan (mis. histogram).
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    def to_bin(v):
+        lo, hi = float(np.min(v)), float(np.max(v))
+        width = (hi - lo) / bins if hi > lo else 1.0
+        idx = np.minimum(((v - lo) / width).astype(np.int64), bins - 1)
+        return idx, lo, width
+
+    ix, x_lo, x_w = to_bin(x)
+    iy, y_lo, y_w = to_bin(y)
+
+    if groups is None:
+        group_values, codes = np.array([None]), np.zeros(len(x), dtype=np.int64)
+    else:
+        group_values, codes = np.unique(np.asarray(groups), return_inverse=True)
+
+    key = (codes * bins + ix) * bins + iy
+    if weights is None:
+        uniq, counts = np.unique(key, return_counts=True)
+    else:
+        uniq, inverse = np.unique(key, return_inverse=True)
+        counts = np.bincount(inverse, weights=np.asarray(weights, dtype=np.float64)).round().astype(np.int64)
+
+    binned = pd.DataFrame({
+        "x": x_lo + (uniq // bins % bins + 0.5) * x_w,
+        "y": y_lo + (uniq % bins + 0.5) * y_w,
+        "count": counts,
+    })
+    if groups is not None:
+        binned["group"] = group_values[uniq // (bins * bins)]
+    return binned
+
+
+def scatter_auto(df, x, y, color=None, marker_color=None, opacity=0.6, **px_kwargs):
+    # Scatter yang otomatis pindah ke WebGL / binning kalau titiknya banyak.
+    # Return (fig, mode) supaya UI bisa menampilkan mode yang dipakai.
+    mode = choose_render_mode(len(df))
+
+    if mode in ("svg", "webgl"):
+        fig = px.scatter(df, x=x, y=y, color=color, opacity=opacity, render_mode=mode, **px_kwargs)
+        if marker_color is not None:
+            fig.update_traces(marker=dict(color=marker_color))
+        return fig, mode
+
+    groups = df[color].to_numpy() if color is not None else None
+    binned = bin_points(df[x].to_numpy(), df[y].to_numpy(), groups)
+    binned = binned.rename(columns={"x": x, "y": y})
+
+    if color is not None:
+        binned = binned.rename(columns={"group": color})
+        binned[color] = binned[color].astype(str)
+
+    fig = px.scatter(
+        binned, x=x, y=y, color=color, size="count", size_max=18,
+        hover_data={"count": True}, opacity=opacity, render_mode="webgl", **px_kwargs
+    )
+    if marker_color is not None:
+        fig.update_traces(marker=dict(color=marker_color))
+    return fig, mode
+
+
+def scatter_counts(points, x, y, count="count", marker_color=None, opacity=0.6, **px_kwargs):
+    # titik yang sudah dihitung per (x, y), ukuran titik = jumlah; kalau pasangan unik
+    # lebih dari GRID_BINS², digabung lagi ke grid (payload tetap terbatas)
+    mode = "counts"
+    if len(points) > GRID_BINS * GRID_BINS:
+        points = bin_points(points[x].to_numpy(), points[y].to_numpy(), weights=points[count].to_numpy())
+        points = points.rename(columns={"x": x, "y": y, "count": count})
+        mode = "binned"
+
+    fig = px.scatter(
+        points, x=x, y=y, size=count, size_max=18,
+        hover_data={count: True}, opacity=opacity, render_mode="webgl", **px_kwargs
+    )
+    if marker_color is not None:
+        fig.update_traces(marker=dict(color=marker_color))
+    return fig, mode
+
+
+def render_caption(mode, n_points):
+    text = f"{n_points:,} titik, dirender dengan {RENDER_MODE_LABELS[mode]}"
+    if mode == "binned":
+        text += f" ({GRID_BINS}×{GRID_BINS} sel, ukuran titik = jumlah siswa)"
+    elif mode == "counts":
+        text += " (ukuran titik = jumlah siswa)"
+    return text + "."
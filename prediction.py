@@ -1,36 +1,115 @@
+import io
+import time
+
 import streamlit as st
 import pandas as pd
-import joblib
+import scipy.sparse as sp
+from features import DEFAULT_TRANSFORM, ENGINEERED_COLS
+from instrumentation import span
+from model_server import get_model_server
 
 def build_engineered_features(row: dict) -> dict:
-    interest_cols = [
-        "basketball","football","soccer","softball","volleyball",
-        "swimming","cheerleading","baseball","tennis","sports",
-        "dance","band","marching","music","rock","hair","dress","blonde"
-    ]
-    existing = [c for c in interest_cols if c in row]
+    # fitur turunan lewat FeatureTransform yang sama dengan training & batch
+    values = DEFAULT_TRANSFORM.transform(row)[0]
+    for col in ENGINEERED_COLS:
+        row[col] = float(values[DEFAULT_TRANSFORM.output_cols.index(col)])
+    return row
 
-    row["total_interest"] = sum(float(row[c]) for c in existing)
-    row["active_interest_count"] = sum(1 for c in existing if float(row[c]) > 0)
 
-    arts_cols = [c for c in ["dance","band","marching","music","rock","hair","dress","blonde"] if c in row]
-    row["arts_interest"] = sum(float(row[c]) for c in arts_cols)
+def score_row(bundle, row):
+    # Satu siswa: scorer nearest-centroid dari bundle (scaler & kolom sudah dilipat
+    # ke centroid, tanpa DataFrame) -> cluster + jarak + confidence.
+    scorer = bundle.get("scorer")
+    if scorer is not None:
+        return scorer.score_row(row)
+    return {"cluster": int(_predict_row_sklearn(bundle, row)), "distance": None, "confidence": None}
 
-    sports_cols = [c for c in ["basketball","football","soccer","softball","volleyball",
-                               "swimming","cheerleading","baseball","tennis","sports"] if c in row]
-    row["sports_interest"] = sum(float(row[c]) for c in sports_cols)
 
-    return row
+def predict_row(bundle, row):
+    return score_row(bundle, row)["cluster"]
+
+
+def _predict_row_sklearn(bundle, row):
+    # Jalur lama (bundle tanpa scorer): fitur turunan -> urutan kolom scaler -> scaling
+    # -> hanya kolom yang dipakai KMeans saat training.
+    model, scaler, used_cols = bundle["model"], bundle["scaler"], bundle["used_cols"]
+    if not hasattr(scaler, "feature_names_in_"):
+        raise ValueError("Scaler tidak punya feature_names_in_. Simpan scaler dari DataFrame saat fit.")
+
+    row = build_engineered_features(dict(row))
+    input_df = pd.DataFrame([row])
+
+    expected_scaler = list(scaler.feature_names_in_)
+    for col in expected_scaler:
+        if col not in input_df.columns:
+            input_df[col] = 0
+    input_df = input_df[expected_scaler]
+
+    idx = [expected_scaler.index(c) for c in used_cols]
+    return model.predict(scaler.transform(input_df)[:, idx])[0]
+
+
+def _scaled_batch(bundle, df):
+    # Versi batch: FeatureTransform (matriks, tanpa loop per baris) menghasilkan
+    # kolom sesuai urutan scaler; scaler & seleksi kolom cukup sekali per batch.
+    scaler, used_cols = bundle["scaler"], bundle["used_cols"]
+    if not hasattr(scaler, "feature_names_in_"):
+        raise ValueError("Scaler tidak punya feature_names_in_. Simpan scaler dari DataFrame saat fit.")
+
+    expected_scaler = list(scaler.feature_names_in_)
+    transform = bundle["transform"]
+    if transform.output_cols != expected_scaler:
+        raise ValueError("Layout FeatureTransform tidak sama dengan kolom scaler.")
+
+    idx = [expected_scaler.index(c) for c in used_cols]
+    features = transform.transform_frame(df)
+    return scaler.transform(features)[:, idx]
+
+
+def predict_batch(bundle, df):
+    # CSR (kolom input mentah, urutan transform.input_cols) -> scorer langsung di
+    # atas non-zero, tanpa DataFrame / matriks dense n × kolom
+    if sp.issparse(df):
+        scorer = bundle.get("scorer")
+        if scorer is None:
+            raise ValueError("Prediksi batch sparse butuh scorer di bundle.")
+        return scorer.score_matrix(df)[0]
+    return bundle["model"].predict(_scaled_batch(bundle, df))
+
+
+def predict_batch_embedded(bundle, df):
+    # label + posisi PCA 2D dari komponen di bundle (tanpa fit ulang); None kalau
+    # bundle lama belum menyimpan proyeksi
+    X = _scaled_batch(bundle, df)
+    projection = bundle.get("projection")
+    return bundle["model"].predict(X), projection.transform(X) if projection is not None else None
+
+
+def embed_row(bundle, row):
+    # bundle dengan scorer: proyeksi terlipat (tanpa DataFrame / scaler.transform)
+    embedder = bundle.get("embedder")
+    if embedder is not None:
+        return embedder.embed_row(row)
+    projection = bundle.get("projection")
+    if projection is None:
+        return None
+    return projection.transform(_scaled_batch(bundle, pd.DataFrame([row])))[0]
+
+
+def read_uploaded_table(uploaded):
+    if uploaded.name.lower().endswith(".parquet"):
+        return pd.read_parquet(io.BytesIO(uploaded.getvalue()))
+    return pd.read_csv(uploaded)
 
 
 def prediction_app():
     st.markdown("## 🧙‍♂️ Prediction App")
     st.caption("Masukkan data siswa untuk memprediksi cluster.")
 
-    # Load model, scaler, dan fitur yang dipakai KMeans
-    model = joblib.load("Finpro_model.pkl")
-    scaler = joblib.load("Finpro_scaler.pkl")
-    used_cols = joblib.load("Finpro_features.pkl")  # ✅ fitur FIX sesuai training
+    # Model, scaler, dan fitur KMeans dari model server (di-load sekali per proses,
+    # otomatis ganti ke bundle terbaru di artifacts/LATEST)
+    with span("predict.get_bundle"):
+        bundle = get_model_server().get()
 
     # ========= INPUT =========
     st.markdown("### Data Dasar")
@@ -94,32 +173,68 @@ def prediction_app():
             "blonde": blonde,
         }
 
-        # 2) tambahin fitur turunan (kalau dipakai training)
-        row = build_engineered_features(row)
-
-        input_df = pd.DataFrame([row])
-
-        # 3) samakan kolom untuk scaler (kalau scaler simpan feature_names_in_)
-        if hasattr(scaler, "feature_names_in_"):
-            expected_scaler = list(scaler.feature_names_in_)
-            for col in expected_scaler:
-                if col not in input_df.columns:
-                    input_df[col] = 0
-            input_df = input_df[expected_scaler]
-
-        # 4) scaling
-        input_scaled = scaler.transform(input_df)
-
-        # 5) IMPORTANT: ambil hanya kolom yang dipakai KMeans saat training
-        # Caranya: cari index kolom used_cols dari expected_scaler
-        if hasattr(scaler, "feature_names_in_"):
-            expected_scaler = list(scaler.feature_names_in_)
-            idx = [expected_scaler.index(c) for c in used_cols]
-            input_scaled_used = input_scaled[:, idx]
-        else:
-            st.error("Scaler tidak punya feature_names_in_. Simpan scaler dari DataFrame saat fit.")
+        try:
+            with span("predict.single_row"):
+                scored = score_row(bundle, row)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        st.success(f"✅ Prediksi cluster: **{scored['cluster']}**")
+        if scored["confidence"] is not None:
+            st.caption(
+                f"Confidence {scored['confidence']:.0%} (1 − jarak ke centroid terdekat / jarak ke centroid kedua), "
+                f"jarak ke centroid: {scored['distance']:.3f}."
+            )
+        position = embed_row(bundle, row)
+        if position is not None:
+            st.caption(f"Posisi di peta PCA 2D: PC1={position[0]:.2f}, PC2={position[1]:.2f}.")
+
+    # ========= BATCH =========
+    st.markdown("---")
+    st.markdown("### Prediksi Batch (Roster Kelas)")
+    st.caption("Upload file CSV/Parquet dengan kolom yang sama seperti input di atas "
+               "(gradyear, NumberOffriends, dan kolom minat).")
+
+    uploaded = st.file_uploader("Upload roster siswa", type=["csv", "parquet"])
+    if uploaded is not None:
+        try:
+            with span("predict.batch_read"):
+                roster = read_uploaded_table(uploaded)
+        except Exception as e:
+            st.error(f"File tidak bisa dibaca: {e}")
+            return
+
+        if roster.empty:
+            st.warning("File tidak berisi baris data.")
             return
 
-        # 6) predict
-        cluster_pred = model.predict(input_scaled_used)[0]
-        st.success(f"✅ Prediksi cluster: **{cluster_pred}**")
\ No newline at end of file
+        t0 = time.perf_counter()
+        try:
+            with span("predict.batch_predict"):
+                labels, embedding = predict_batch_embedded(bundle, roster)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        elapsed = time.perf_counter() - t0
+
+        result = roster.assign(cluster=labels)
+        if embedding is not None:
+            result = result.assign(PC1=embedding[:, 0], PC2=embedding[:, 1])
+
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Jumlah Baris", f"{len(result):,}")
+        m2.metric("Waktu Prediksi", f"{elapsed * 1000:.1f} ms")
+        m3.metric("Throughput", f"{len(result) / max(elapsed, 1e-9):,.0f} baris/detik")
+
+        with span("predict.batch_render"):
+            st.dataframe(result["cluster"].value_counts().sort_index().rename("jumlah_siswa"),
+                         use_container_width=True)
+            st.dataframe(result.head(50), use_container_width=True)
+
+            st.download_button(
+                "Download Hasil Prediksi (CSV)",
+                data=result.to_csv(index=False).encode("utf-8"),
+                file_name=f"prediksi_{uploaded.name.rsplit('.', 1)[0]}.csv",
+                mime="text/csv",
+                use_container_width=True,
+            )
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+# =========================
+# Profiling per cluster (satu pass terkelompok)
+# =========================
+# Baris diurutkan sekali berdasarkan label, lalu semua statistik diambil per
+# segmen: jumlah & jumlah aktif lewat np.add.reduceat (satu panggilan untuk
+# semua cluster), median per segmen. Biaya ~O(n·d) berapa pun jumlah cluster.
+PROFILE_STATS = {
+    "mean": "Rata-rata",
+    "median": "Median",
+    "active_share": "Share aktif (> 0)",
+    "lift": "Lift vs populasi",
+}
+
+
+def cluster_profile(X, labels, columns, k=None):
+    X = np.asarray(X)
+    labels = np.asarray(labels)
+    k = int(k if k is not None else labels.max() + 1)
+    n, d = X.shape
+
+    counts = np.bincount(labels, minlength=k)
+    order = np.argsort(labels, kind="stable")
+    Xs = X[order]
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    nonempty = np.flatnonzero(counts)
+    starts = offsets[nonempty]
+
+    mean = np.full((k, d), np.nan)
+    median = np.full((k, d), np.nan)
+    active_share = np.full((k, d), np.nan)
+
+    sums = np.add.reduceat(Xs, starts, axis=0, dtype=np.float64)
+    active = np.add.reduceat(Xs > 0, starts, axis=0, dtype=np.int64)
+    mean[nonempty] = sums / counts[nonempty, None]
+    active_share[nonempty] = active / counts[nonempty, None]
+    for c, start in zip(nonempty, starts):
+        median[c] = np.median(Xs[start:start + counts[c]], axis=0)
+
+    # populasi = gabungan semua segmen (tanpa pass tambahan ke X)
+    pop_mean = sums.sum(axis=0) / max(n, 1)
+    lift = np.divide(mean, pop_mean, out=np.full_like(mean, np.nan), where=pop_mean != 0)
+
+    index = pd.RangeIndex(k, name="cluster")
+
+    def frame(values):
+        return pd.DataFrame(values, index=index, columns=list(columns))
+
+    return {
+        "count": pd.Series(counts, index=index, name="jumlah_siswa"),
+        "mean": frame(mean),
+        "median": frame(median),
+        "active_share": frame(active_share),
+        "lift": frame(lift),
+        "population_mean": pd.Series(pop_mean, index=list(columns)),
+    }
+
+
+def top_n(stat_frame, cols, n=3):
+    # top-N kolom per cluster dari matriks cluster × kolom: argpartition O(k·m),
+    # lalu hanya N kandidat yang diurutkan
+    cols = [c for c in cols if c in stat_frame.columns]
+    values = stat_frame[cols].to_numpy(dtype=np.float64)
+    n = min(n, len(cols))
+    if n == 0:
+        return np.empty((len(values), 0), dtype=np.int64), np.empty((len(values), 0))
+
+    filled = np.where(np.isnan(values), -np.inf, values)
+    if n < len(cols):
+        candidates = np.argpartition(-filled, n - 1, axis=1)[:, :n]
+    else:
+        candidates = np.tile(np.arange(len(cols)), (len(values), 1))
+    cand_values = np.take_along_axis(filled, candidates, axis=1)
+    ranked = np.argsort(-cand_values, axis=1, kind="stable")
+    idx = np.take_along_axis(candidates, ranked, axis=1)
+    return np.asarray(cols)[idx], np.take_along_axis(values, idx, axis=1)
+
+
+def top_n_table(stat_frame, cols, n=3):
+    # format tabel lama: cluster | Top 1 | Top 2 | ... ("nama (nilai)")
+    names, values = top_n(stat_frame, cols, n)
+    table = pd.DataFrame({"cluster": stat_frame.index.to_numpy()})
+    for i in range(names.shape[1]):
+        table[f"Top {i + 1}"] = [f"{name} ({val:.2f})" for name, val in zip(names[:, i], values[:, i])]
+    return table
@@ -0,0 +1,79 @@
+import numpy as np
+from sklearn.decomposition import PCA, IncrementalPCA
+
+# =========================
+# Proyeksi 2D (PCA) untuk visualisasi cluster
+# =========================
+# Hasil fit cukup komponen + mean (ukuran d × 2), jadi disimpan di bundle dan
+# siswa baru / batch diproyeksikan dengan satu matmul tanpa fit ulang.
+#   auto        : solver pilihan sklearn (n >> d -> eigen kovarians, O(n·d²))
+#   randomized  : randomized SVD
+#   incremental : IncrementalPCA per potongan baris (memori ~ chunk_rows × d)
+# Kalau kovarians sudah ada (mis. jalur sparse), komponen cukup dari eigh d × d.
+PROJECTION_METHODS = ("auto", "randomized", "incremental")
+PROJECTION_COMPONENTS = 2
+PROJECTION_CHUNK_ROWS = 65536
+PROJECTION_RANDOM_STATE = 42
+
+
+class Projection:
+
+    def __init__(self, components, mean, explained_variance_ratio, method, n_rows):
+        self.components = np.asarray(components, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.explained_variance_ratio = [float(v) for v in explained_variance_ratio]
+        self.method = method
+        self.n_rows = int(n_rows)
+
+    @classmethod
+    def from_estimator(cls, pca, method):
+        # PCA -> n_samples_, IncrementalPCA -> n_samples_seen_
+        n_rows = getattr(pca, "n_samples_seen_", None)
+        if n_rows is None:
+            n_rows = pca.n_samples_
+        return cls(pca.components_, pca.mean_, pca.explained_variance_ratio_, method, n_rows)
+
+    def transform(self, X, chunk_rows=PROJECTION_CHUNK_ROWS):
+        # X = matriks scaled (kolom used_cols) -> embedding float32 (n × 2), per chunk
+        X = np.asarray(X)
+        if X.dtype.kind != "f":
+            X = X.astype(np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        out = np.empty((len(X), len(self.components)), dtype=np.float32)
+        W = self.components.T.astype(X.dtype, copy=False)
+        offset = (self.mean @ self.components.T).astype(X.dtype, copy=False)
+        for start in range(0, len(X), chunk_rows):
+            stop = start + chunk_rows
+            out[start:stop] = X[start:stop] @ W - offset
+        return out
+
+
+def fit_projection(X, method="auto", n_components=PROJECTION_COMPONENTS, chunk_rows=PROJECTION_CHUNK_ROWS,
+                   random_state=PROJECTION_RANDOM_STATE):
+    if method not in PROJECTION_METHODS:
+        raise ValueError(f"Metode proyeksi tidak dikenal: {method}")
+    if method == "incremental":
+        pca = IncrementalPCA(n_components=n_components)
+        for start in range(0, len(X), chunk_rows):
+            batch = X[start:start + chunk_rows]
+            # potongan terakhir yang lebih kecil dari n_components tidak bisa di-partial_fit
+            if len(batch) >= n_components:
+                pca.partial_fit(batch)
+        return Projection.from_estimator(pca, method)
+
+    solver = "randomized" if method == "randomized" else "auto"
+    pca = PCA(n_components=n_components, svd_solver=solver, random_state=random_state).fit(X)
+    return Projection.from_estimator(pca, method)
+
+
+def projection_from_covariance(cov, mean, n_rows, n_components=PROJECTION_COMPONENTS):
+    # PCA dari matriks kovarians (d × d): tanpa menyentuh baris data lagi
+    eigvals, eigvecs = np.linalg.eigh(cov)
+    order = np.argsort(eigvals)[::-1][:n_components]
+    components = eigvecs[:, order].T
+    # tanda sama dengan konvensi sklearn (svd_flip): elemen terbesar tiap komponen positif
+    signs = np.sign(components[np.arange(len(components)), np.abs(components).argmax(axis=1)])
+    components *= np.where(signs == 0, 1.0, signs)[:, None]
+    ratio = eigvals[order] / max(eigvals.clip(min=0).sum(), 1e-12)
+    return Projection(components, mean, ratio, "covariance", n_rows)
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+import joblib
+import numpy as np
+
+from dataset import BASE_DIR, file_sha256
+from features import FeatureTransform
+from instrumentation import span
+from io_util import write_text_atomic
+from scorer import CentroidScorer, RowEmbedder
+
+# =========================
+# Registry artefak model (bundle berversi)
+# =========================
+ARTIFACT_DIR = os.path.join(BASE_DIR, "artifacts")
+LATEST_FILE = os.path.join(ARTIFACT_DIR, "LATEST")
+MANIFEST_NAME = "manifest.json"
+
+# nama file di dalam bundle = nama file lama di root repo
+MODEL_FILE = "Finpro_model.pkl"
+SCALER_FILE = "Finpro_scaler.pkl"
+FEATURES_FILE = "Finpro_features.pkl"
+USED_COLS_FILE = "Finpro_used_cols.pkl"
+TRANSFORM_FILE = "Finpro_transform.pkl"
+SCORER_FILE = "Finpro_scorer.pkl"        # scaler + kolom + centroid dilipat (prediksi cepat)
+PROJECTION_FILE = "Finpro_projection.pkl"  # komponen PCA 2D (proyeksi siswa baru)
+
+
+def bundle_fingerprint(files):
+    # satu hash untuk seluruh isi bundle: berubah kalau satu file saja diganti
+    return hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()
+
+
+def save_bundle(model, scaler, used_cols, manifest, transform=None, projection=None):
+    # Tulis ke folder sementara dulu, lalu rename (atomic) dan update LATEST.
+    # Pembaca tidak akan pernah melihat bundle setengah jadi.
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    data_hash = (manifest.get("data") or {}).get("sha256", "nodata")
+    version = f"{time.strftime('%Y%m%d-%H%M%S')}-{data_hash[:8]}-{uuid.uuid4().hex[:4]}"
+
+    tmp_dir = os.path.join(ARTIFACT_DIR, f".tmp-{version}")
+    os.makedirs(tmp_dir)
+    try:
+        joblib.dump(model, os.path.join(tmp_dir, MODEL_FILE))
+        joblib.dump(scaler, os.path.join(tmp_dir, SCALER_FILE))
+        joblib.dump(list(used_cols), os.path.join(tmp_dir, FEATURES_FILE))
+        joblib.dump(list(used_cols), os.path.join(tmp_dir, USED_COLS_FILE))
+        transform = transform or FeatureTransform(scaler.feature_names_in_)
+        joblib.dump(transform, os.path.join(tmp_dir, TRANSFORM_FILE))
+        joblib.dump(CentroidScorer.from_parts(model, scaler, used_cols, transform),
+                    os.path.join(tmp_dir, SCORER_FILE))
+        names = [MODEL_FILE, SCALER_FILE, FEATURES_FILE, USED_COLS_FILE, TRANSFORM_FILE, SCORER_FILE]
+        if projection is not None:
+            joblib.dump(projection, os.path.join(tmp_dir, PROJECTION_FILE))
+            names.append(PROJECTION_FILE)
+
+        files = {name: file_sha256(os.path.join(tmp_dir, name)) for name in names}
+        manifest = dict(manifest, version=version,
+                        created_at=time.strftime("%Y-%m-%dT%H:%M:%S%z"), files=files,
+                        fingerprint=bundle_fingerprint(files))
+        write_text_atomic(os.path.join(tmp_dir, MANIFEST_NAME), json.dumps(manifest, indent=2), fsync=True)
+
+        os.replace(tmp_dir, os.path.join(ARTIFACT_DIR, version))
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    write_text_atomic(LATEST_FILE, version + "\n", fsync=True)
+    return version
+
+
+def latest_version():
+    try:
+        with open(LATEST_FILE, "r", encoding="utf-8") as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    return version or None
+
+
+def bundle_dir(version):
+    return os.path.join(ARTIFACT_DIR, version)
+
+
+def read_manifest(version):
+    with open(os.path.join(bundle_dir(version), MANIFEST_NAME), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_bundle(version, manifest=None):
+    # cocokkan sha256 tiap file dengan checksum di manifest
+    manifest = manifest or read_manifest(version)
+    folder = bundle_dir(version)
+    if "fingerprint" in manifest and manifest["fingerprint"] != bundle_fingerprint(manifest.get("files", {})):
+        raise ValueError(f"Fingerprint bundle {version} tidak cocok dengan daftar file di manifest.")
+    for name, expected in manifest.get("files", {}).items():
+        actual = file_sha256(os.path.join(folder, name))
+        if actual != expected:
+            raise ValueError(f"Checksum {name} di bundle {version} tidak cocok.")
+    return manifest
+
+
+def load_bundle(version=None, verify=False):
+    # Bundle terbaru dari registry; kalau belum ada, pakai file Finpro_*.pkl lama di root.
+    with span("registry.load_bundle"):
+        return _load_bundle(version, verify)
+
+
+def _load_bundle(version, verify):
+    version = version or latest_version()
+    if version is None:
+        folder, manifest = BASE_DIR, None
+    else:
+        folder, manifest = bundle_dir(version), read_manifest(version)
+        if verify:
+            verify_bundle(version, manifest)
+
+    scaler = joblib.load(os.path.join(folder, SCALER_FILE))
+
+    # bundle lama / file root belum punya transform -> bangun dari layout scaler
+    transform_path = os.path.join(folder, TRANSFORM_FILE)
+    if os.path.exists(transform_path):
+        transform = joblib.load(transform_path)
+    else:
+        transform = FeatureTransform(getattr(scaler, "feature_names_in_", None))
+
+    model = joblib.load(os.path.join(folder, MODEL_FILE))
+    used_cols = joblib.load(os.path.join(folder, FEATURES_FILE))
+
+    # bundle lama belum punya scorer -> lipat dari model + scaler saat load
+    scorer_path = os.path.join(folder, SCORER_FILE)
+    if os.path.exists(scorer_path):
+        scorer = joblib.load(scorer_path)
+    elif hasattr(scaler, "feature_names_in_"):
+        scorer = CentroidScorer.from_parts(model, scaler, used_cols, transform)
+    else:
+        scorer = None
+
+    # bundle lama tanpa proyeksi -> None (halaman prediksi tidak menampilkan posisi PCA)
+    projection_path = os.path.join(folder, PROJECTION_FILE)
+    projection = joblib.load(projection_path) if os.path.exists(projection_path) else None
+
+    used_cols_path = os.path.join(folder, USED_COLS_FILE)
+    if os.path.exists(used_cols_path) and list(joblib.load(used_cols_path)) != list(used_cols):
+        raise ValueError(f"Artefak tidak cocok ({version or 'root'}): {FEATURES_FILE} != {USED_COLS_FILE}.")
+
+    bundle = {
+        "version": version,
+        "manifest": manifest,
+        "model": model,
+        "scaler": scaler,
+        "used_cols": used_cols,
+        "transform": transform,
+        "scorer": scorer,
+        "projection": projection,
+    }
+    check_bundle(bundle)
+    # posisi PCA satu siswa: proyeksi dilipat ke scorer (satu matvec kecil per prediksi)
+    bundle["embedder"] = (RowEmbedder.from_scorer(scorer, projection, scaler, used_cols)
+                          if scorer is not None and projection is not None else None)
+    return bundle
+
+
+def check_bundle(bundle):
+    # Tolak kombinasi artefak yang tidak saling cocok (mis. scaler dari training lain
+    # dipasangkan dengan daftar fitur / model lama) sebelum dipakai untuk prediksi.
+    def mismatch(detail):
+        return ValueError(f"Artefak tidak cocok ({bundle['version'] or 'root'}): {detail}")
+
+    model, scaler, used_cols = bundle["model"], bundle["scaler"], list(bundle["used_cols"])
+    n_centers = np.asarray(model.cluster_centers_).shape
+    if n_centers[1] != len(used_cols):
+        raise mismatch(f"model punya {n_centers[1]} fitur, daftar fitur {len(used_cols)}.")
+
+    scaler_cols = getattr(scaler, "feature_names_in_", None)
+    if scaler_cols is not None:
+        scaler_cols = list(scaler_cols)
+        missing = [c for c in used_cols if c not in scaler_cols]
+        if missing:
+            raise mismatch(f"kolom {missing} tidak ada di scaler.")
+        if bundle["transform"].output_cols != scaler_cols:
+            raise mismatch("layout FeatureTransform berbeda dengan kolom scaler.")
+
+    scorer = bundle.get("scorer")
+    if scorer is not None:
+        if scorer.input_cols != bundle["transform"].input_cols:
+            raise mismatch("kolom input scorer berbeda dengan FeatureTransform.")
+        if scaler_cols is not None:
+            # centroid terlipat harus sama dengan hasil lipat ulang dari model + scaler
+            expected = CentroidScorer.from_parts(model, scaler, used_cols, bundle["transform"])
+            if (expected._centers.shape != scorer._centers.shape
+                    or not np.allclose(expected._centers, scorer._centers, rtol=1e-6, atol=1e-8)):
+                raise mismatch("scorer tidak berasal dari model + scaler ini.")
+
+    projection = bundle.get("projection")
+    if projection is not None and projection.components.shape[1] != len(used_cols):
+        raise mismatch("dimensi proyeksi PCA berbeda dengan daftar fitur.")
+
+    manifest = bundle.get("manifest") or {}
+    if "features" in manifest and list(manifest["features"].get("used_cols", used_cols)) != used_cols:
+        raise mismatch("daftar fitur berbeda dengan manifest.")
+    if "k" in manifest and int(manifest["k"]) != n_centers[0]:
+        raise mismatch(f"manifest k={manifest['k']}, model punya {n_centers[0]} centroid.")
+
+
+def latest_manifest():
+    version = latest_version()
+    return read_manifest(version) if version else None
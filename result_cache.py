@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import threading
+
+import joblib
+
+from dataset import CACHE_DIR
+from io_util import write_atomic, write_text_atomic
+from memo import LRUMemo
+
+# =========================
+# Cache hasil di disk (dipakai bersama antar sesi & restart server)
+# =========================
+# key = hash(namespace, versi dataset, config pipeline). File terlama (mtime,
+# di-touch saat dibaca) dihapus kalau total ukuran melewati MAX_CACHE_BYTES.
+# Index kecil (string, mis. digest stage DAG) disimpan terpisah: tidak ikut memo
+# LRU nilai besar dan tidak ikut scan eviction.
+RESULT_DIR = os.path.join(CACHE_DIR, "results")
+INDEX_DIR = os.path.join(RESULT_DIR, "index")
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+_MEMO_SIZE = 4
+
+_LOCK = threading.Lock()
+_MEMO = LRUMemo(_MEMO_SIZE)
+_INDEX = {}
+_KEY_LOCKS = {}
+
+
+def cache_key(namespace, version, config):
+    payload = json.dumps({"namespace": namespace, "version": version, "config": config},
+                         sort_keys=True, default=str)
+    return f"{namespace}-{hashlib.sha256(payload.encode()).hexdigest()[:24]}"
+
+
+def _path(key):
+    return os.path.join(RESULT_DIR, f"{key}.joblib")
+
+
+def get(key):
+    value = _MEMO.get(key)
+    if value is not None:
+        return value
+
+    path = _path(key)
+    try:
+        value = joblib.load(path)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # file rusak / terpotong / tidak bisa di-unpickle lagi (mis. fungsi stage
+        # di-rename) -> anggap miss dan hapus supaya dihitung ulang
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    try:
+        os.utime(path)   # tandai baru dipakai (urutan eviction)
+    except OSError:
+        pass
+    _MEMO.put(key, value)
+    return value
+
+
+def evict(max_bytes=MAX_CACHE_BYTES):
+    try:
+        entries = [e for e in os.scandir(RESULT_DIR) if e.name.endswith(".joblib")]
+    except OSError:
+        return
+    stats = sorted(((e.stat().st_mtime_ns, e.stat().st_size, e.path) for e in entries))
+    total = sum(size for _, size, _ in stats)
+    for _, size, path in stats:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+
+
+def put(key, value):
+    os.makedirs(RESULT_DIR, exist_ok=True)
+    path = _path(key)
+    write_atomic(path, lambda tmp: joblib.dump(value, tmp))
+    _MEMO.put(key, value)
+    evict()
+
+
+def get_or_compute(namespace, version, config, compute):
+    # satu sesi menghitung, sesi lain dengan key yang sama menunggu lalu membaca hasilnya
+    key = cache_key(namespace, version, config)
+    value = get(key)
+    if value is not None:
+        return value, True
+
+    with _LOCK:
+        key_lock = _KEY_LOCKS.setdefault(key, threading.Lock())
+    try:
+        with key_lock:
+            value = get(key)
+            if value is not None:
+                return value, True
+            value = compute()
+            put(key, value)
+    finally:
+        # dibersihkan juga kalau compute() gagal (lock tidak menumpuk per key gagal)
+        with _LOCK:
+            _KEY_LOCKS.pop(key, None)
+    return value, False
+
+
+def get_index(key):
+    with _LOCK:
+        if key in _INDEX:
+            return _INDEX[key]
+    try:
+        with open(os.path.join(INDEX_DIR, key), "r", encoding="utf-8") as f:
+            value = f.read()
+    except OSError:
+        return None
+    with _LOCK:
+        _INDEX[key] = value
+    return value
+
+
+def put_index(key, value):
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    write_text_atomic(os.path.join(INDEX_DIR, key), value)
+    with _LOCK:
+        _INDEX[key] = value
@@ -0,0 +1,131 @@
+import math
+
+import numpy as np
+import scipy.sparse as sp
+
+from features import ENGINEERED_COLS, FeatureTransform
+
+# =========================
+# Scorer nearest-centroid (tanpa DataFrame / validasi sklearn)
+# =========================
+# Fitur turunan, seleksi kolom & StandardScaler semuanya linear (kecuali
+# indikator minat > 0), jadi dilipat ke dua matriks kecil saat export:
+#   z = x @ A + (x[minat] > 0) @ B        (x = kolom input mentah)
+# dan jarak ke centroid cukup ||z - c||² untuk k centroid.
+SPARSE_CHUNK_ROWS = 65536
+
+
+class CentroidScorer:
+
+    def __init__(self, input_cols, interest_idx, A, B, centers):
+        self.input_cols = list(input_cols)
+        self.n_clusters = len(centers)
+        self._interest_idx = np.asarray(interest_idx)
+        self._A = np.ascontiguousarray(A, dtype=np.float64)
+        self._B = np.ascontiguousarray(B, dtype=np.float64)
+        self._centers = np.ascontiguousarray(centers, dtype=np.float64)
+
+    @classmethod
+    def from_parts(cls, model, scaler, used_cols, transform=None):
+        scaler_cols = list(scaler.feature_names_in_)
+        transform = transform or FeatureTransform(scaler_cols)
+        n_in, m = len(transform.input_cols), len(transform._interest_idx)
+        all_cols = transform.input_cols + ENGINEERED_COLS
+        sel = [all_cols.index(c) for c in used_cols]
+
+        # layout penuh (input + engineered) sebagai fungsi linear dari x dan (minat > 0)
+        linear = np.zeros((n_in, len(all_cols)))
+        linear[:, :n_in] = np.eye(n_in)
+        linear[transform._interest_idx, n_in:] += transform._weights[:m]
+        active = np.zeros((m, len(all_cols)))
+        active[:, n_in:] = transform._weights[m:]
+
+        idx = [scaler_cols.index(c) for c in used_cols]
+        inv_scale = 1.0 / scaler.scale_[idx]
+        # (x - mean) / scale -> mean dipindah ke centroid
+        centers = np.asarray(model.cluster_centers_, dtype=np.float64) + scaler.mean_[idx] * inv_scale
+        return cls(transform.input_cols, transform._interest_idx,
+                   linear[:, sel] * inv_scale, active[:, sel] * inv_scale, centers)
+
+    def _project(self, X):
+        return X @ self._A + (X[..., self._interest_idx] > 0) @ self._B
+
+    def score_row(self, row):
+        # satu siswa (dict kolom input) -> cluster, jarak ke centroid, confidence
+        x = np.array([float(row.get(c, 0) or 0) for c in self.input_cols])
+        diff = self._centers - self._project(x)
+        d2 = np.einsum("ij,ij->i", diff, diff).tolist()
+        if not all(map(math.isfinite, d2)):
+            # inf / NaN -> 0 (sama dengan FeatureTransform); jarang, jadi dicek belakangan
+            diff = self._centers - self._project(np.nan_to_num(x, nan=0.0, posinf=0.0, neginf=0.0))
+            d2 = np.einsum("ij,ij->i", diff, diff).tolist()
+
+        best = min(range(self.n_clusters), key=d2.__getitem__)
+        dist = math.sqrt(max(d2[best], 0.0))
+        if self.n_clusters < 2:
+            return {"cluster": best, "distance": dist, "confidence": 1.0}
+        # confidence = 1 - d_terdekat / d_kedua: 0 = tepat di perbatasan, 1 = di centroid
+        second = math.sqrt(max(sorted(d2)[1], 0.0))
+        return {"cluster": best, "distance": dist,
+                "confidence": 1.0 - dist / second if second > 0 else 1.0}
+
+    def score_matrix(self, X):
+        # batch: X (n, kolom input) -> (labels, distance, confidence)
+        if sp.issparse(X):
+            return self._score_sparse(sp.csr_matrix(X, dtype=np.float64, copy=True))
+        X = np.nan_to_num(np.asarray(X, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+        return self._score_projected(self._project(X))
+
+    def _score_sparse(self, X):
+        # CSR: x @ A dan indikator minat langsung dari nilai non-zero; yang dense
+        # hanya blok z (chunk × kolom terpakai) dan hasil per baris
+        X.data = np.nan_to_num(X.data, nan=0.0, posinf=0.0, neginf=0.0)
+        active = X[:, self._interest_idx]
+        active.data = (active.data > 0).astype(np.float64)
+        labels = np.empty(X.shape[0], dtype=np.intp)
+        dist, confidence = np.empty(X.shape[0]), np.empty(X.shape[0])
+        for start in range(0, X.shape[0], SPARSE_CHUNK_ROWS):
+            rows = slice(start, start + SPARSE_CHUNK_ROWS)
+            Z = np.asarray(X[rows] @ self._A + active[rows] @ self._B)
+            labels[rows], dist[rows], confidence[rows] = self._score_projected(Z)
+        return labels, dist, confidence
+
+    def _score_projected(self, Z):
+        d2 = ((Z ** 2).sum(axis=1)[:, None] - 2.0 * (Z @ self._centers.T)
+              + (self._centers ** 2).sum(axis=1))
+        np.maximum(d2, 0.0, out=d2)
+
+        labels = d2.argmin(axis=1)
+        dist = np.sqrt(d2[np.arange(len(d2)), labels])
+        if self.n_clusters < 2:
+            return labels, dist, np.ones(len(d2))
+        second = np.sqrt(np.partition(d2, 1, axis=1)[:, 1])
+        confidence = 1.0 - np.divide(dist, second, out=np.zeros_like(dist), where=second > 0)
+        return labels, dist, confidence
+
+
+class RowEmbedder:
+    # proyeksi PCA 2D dilipat dengan cara yang sama (fitur turunan + scaler + kolom):
+    #   posisi = x @ A + (x[minat] > 0) @ B - offset     (A, B: kolom input × 2)
+
+    def __init__(self, input_cols, interest_idx, A, B, offset):
+        self.input_cols = list(input_cols)
+        self._interest_idx = np.asarray(interest_idx)
+        self._A = np.ascontiguousarray(A, dtype=np.float64)
+        self._B = np.ascontiguousarray(B, dtype=np.float64)
+        self._offset = np.asarray(offset, dtype=np.float64)
+
+    @classmethod
+    def from_scorer(cls, scorer, projection, scaler, used_cols):
+        # z scorer = x_terpakai / scale; ruang scaled = z - mean / scale
+        scaler_cols = list(scaler.feature_names_in_)
+        idx = [scaler_cols.index(c) for c in used_cols]
+        W = projection.components.T
+        shift = scaler.mean_[idx] / scaler.scale_[idx]
+        return cls(scorer.input_cols, scorer._interest_idx, scorer._A @ W, scorer._B @ W,
+                   (shift + projection.mean) @ W)
+
+    def embed_row(self, row):
+        x = np.array([float(row.get(c, 0) or 0) for c in self.input_cols])
+        x = np.nan_to_num(x, nan=0.0, posinf=0.0, neginf=0.0)
+        return x @ self._A + (x[self._interest_idx] > 0) @ self._B - self._offset
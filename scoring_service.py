@@ -0,0 +1,333 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from model_server import get_model_server
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# Service scoring HTTP (asyncio murni, tanpa dependency web framework)
+# =========================
+# Request satu siswa yang datang hampir bersamaan dikumpulkan dalam jendela
+# waktu kecil lalu di-score sekali sebagai batch (CentroidScorer.score_matrix).
+# Bundle diambil dari ModelServer yang sama dengan Prediction App (hot swap).
+HOST = "127.0.0.1"
+PORT = 8765
+BATCH_WINDOW_MS = 2.0
+MAX_BATCH = 256
+MAX_BODY_BYTES = 1024 * 1024
+LATENCY_WINDOW = 10_000     # jumlah latency terakhir untuk persentil
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Metrics:
+    # dipakai dari satu event loop saja -> tanpa lock
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.rows = 0
+        self.batches = 0
+        self.batch_rows = 0
+        self.max_batch = 0
+        self._latency_ms = deque(maxlen=LATENCY_WINDOW)
+        self._recent = deque(maxlen=LATENCY_WINDOW)   # waktu selesai request (throughput 60 detik)
+
+    def record_request(self, latency_ms, rows, error=False):
+        now = time.monotonic()
+        self.requests += 1
+        self.rows += rows
+        self.errors += int(error)
+        self._latency_ms.append(latency_ms)
+        self._recent.append(now)
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batch_rows += size
+        self.max_batch = max(self.max_batch, size)
+
+    def snapshot(self):
+        now = time.monotonic()
+        uptime = now - self.started
+        latency = np.asarray(self._latency_ms) if self._latency_ms else np.zeros(1)
+        p50, p95, p99 = np.percentile(latency, [50, 95, 99])
+        recent = sum(1 for t in self._recent if now - t <= 60.0)
+        return {
+            "uptime_s": round(uptime, 1),
+            "requests": self.requests,
+            "errors": self.errors,
+            "rows_scored": self.rows,
+            "micro_batches": self.batches,
+            "mean_batch_size": round(self.batch_rows / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch,
+            "latency_ms": {"p50": round(float(p50), 3), "p95": round(float(p95), 3),
+                           "p99": round(float(p99), 3), "max": round(float(latency.max()), 3)},
+            "throughput_rps": {"overall": round(self.requests / max(uptime, 1e-9), 1),
+                               "last_60s": round(recent / min(max(uptime, 1e-9), 60.0), 1)},
+        }
+
+
+def _row_vector(input_cols, row):
+    # semantik sama dengan build_engineered_features / CentroidScorer.score_row:
+    # kolom yang tidak ada atau kosong = 0, fitur turunan dihitung dari kolom minat
+    if not isinstance(row, dict):
+        raise HttpError(400, "Setiap baris harus berupa objek JSON {kolom: nilai}.")
+    try:
+        return [float(row.get(c, 0) or 0) for c in input_cols]
+    except (TypeError, ValueError):
+        raise HttpError(400, "Nilai kolom harus berupa angka.") from None
+
+
+def _score(bundle, rows):
+    # (labels, distance, confidence); bundle lama tanpa scorer -> jalur sklearn (tanpa jarak)
+    scorer = bundle.get("scorer")
+    if scorer is not None:
+        X = np.array([_row_vector(scorer.input_cols, row) for row in rows], dtype=np.float64)
+        return scorer.score_matrix(X)
+    from prediction import predict_batch   # jalur lama saja (impor streamlit)
+    for row in rows:
+        _row_vector(bundle["transform"].input_cols, row)
+    labels = predict_batch(bundle, pd.DataFrame(rows))
+    return labels, np.full(len(rows), np.nan), np.full(len(rows), np.nan)
+
+
+def _results(bundle, labels, dist, confidence):
+    return [
+        {"cluster": int(c), "distance": None if np.isnan(d) else float(d),
+         "confidence": None if np.isnan(p) else float(p), "version": bundle["version"]}
+        for c, d, p in zip(labels, dist, confidence)
+    ]
+
+
+class MicroBatcher:
+    # request pertama membuka jendela BATCH_WINDOW_MS; semua request yang masuk
+    # selama jendela (maks MAX_BATCH) di-score dalam satu panggilan
+
+    def __init__(self, metrics, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH):
+        self.metrics = metrics
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, row):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _collect(self):
+        items = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.window
+        while len(items) < self.max_batch:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # sisa antrian yang sudah menunggu ikut batch ini (tanpa menunggu lagi)
+        while len(items) < self.max_batch and not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        return items
+
+    async def _run(self):
+        while True:
+            items = await self._collect()
+            # baris tidak valid dijawab sendiri-sendiri, sisanya tetap satu batch
+            valid = []
+            bundle = get_model_server().get()
+            for row, future in items:
+                try:
+                    _row_vector(bundle["transform"].input_cols, row)
+                except HttpError as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    valid.append((row, future))
+            if not valid:
+                continue
+            try:
+                results = _results(bundle, *_score(bundle, [row for row, _ in valid]))
+            except Exception as e:
+                logger.exception("Scoring micro-batch gagal.")
+                for _, future in valid:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.metrics.record_batch(len(valid))
+            for (_, future), result in zip(valid, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class ScoringService:
+
+    def __init__(self, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH):
+        self.metrics = Metrics()
+        self.batcher = MicroBatcher(self.metrics, window_ms, max_batch)
+
+    async def handle(self, method, path, body):
+        # (status, payload, jumlah baris)
+        if path == "/health":
+            bundle = get_model_server().get()
+            return 200, {"status": "ok", "version": bundle["version"]}, 0
+        if path == "/metrics":
+            bundle = get_model_server().get()
+            return 200, dict(self.metrics.snapshot(), version=bundle["version"],
+                             batch_window_ms=self.batcher.window * 1000.0,
+                             max_batch=self.batcher.max_batch), 0
+        if path not in ("/predict", "/predict/batch"):
+            raise HttpError(404, f"Endpoint tidak dikenal: {path}")
+        if method != "POST":
+            raise HttpError(405, "Gunakan POST untuk prediksi.")
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HttpError(400, "Body bukan JSON yang valid.") from None
+
+        if path == "/predict":
+            # {"row": {...}} atau langsung {kolom: nilai}
+            row = payload.get("row", payload) if isinstance(payload, dict) else payload
+            return 200, await self.batcher.submit(row), 1
+
+        rows = payload.get("rows") if isinstance(payload, dict) else payload
+        if not isinstance(rows, list):
+            raise HttpError(400, "Body batch harus {\"rows\": [...]}.")
+        if not rows:
+            return 200, {"results": []}, 0
+        # batch eksplisit sudah besar -> langsung di-score, tidak lewat jendela micro-batch
+        bundle = get_model_server().get()
+        results = _results(bundle, *_score(bundle, rows))
+        self.metrics.record_batch(len(rows))
+        return 200, {"results": results}, len(rows)
+
+    async def serve_connection(self, reader, writer):
+        # HTTP/1.1 minimal: Content-Length, keep-alive
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Request line tidak valid."}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() == "HTTP/1.1")
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "Content-Length tidak valid."}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Body terlalu besar."}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                t0 = time.perf_counter()
+                rows = 0
+                try:
+                    status, payload, rows = await self.handle(method.upper(), target.split("?", 1)[0], body)
+                except HttpError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception:
+                    logger.exception("Request %s %s gagal.", method, target)
+                    status, payload = 500, {"error": "Kesalahan internal."}
+                if target.startswith("/predict"):
+                    self.metrics.record_request((time.perf_counter() - t0) * 1000.0, rows, error=status != 200)
+
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host=HOST, port=PORT):
+        # bundle di-load sebelum menerima request pertama
+        bundle = get_model_server().get()
+        self.batcher.start()
+        server = await asyncio.start_server(self.serve_connection, host, port)
+        logger.info("Scoring service di http://%s:%d (bundle %s)", host, port, bundle["version"])
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service HTTP untuk prediksi cluster siswa (micro-batching).")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--window-ms", type=float, default=BATCH_WINDOW_MS,
+                        help="jendela waktu pengumpulan request satu baris menjadi satu batch")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    service = ScoringService(window_ms=args.window_ms, max_batch=args.max_batch)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
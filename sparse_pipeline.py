@@ -0,0 +1,110 @@
+import copy
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from evaluation import DEFAULT_SAMPLE_SIZE, silhouette
+from features import DEFAULT_TRANSFORM, FeatureTransform
+from instrumentation import Stopwatch
+from pipeline import CORR_THRESHOLD, FINAL_K, N_INIT, RANDOM_STATE, ZERO_RATIO_MAX, _predict_ready
+from projection import projection_from_covariance
+from streaming_train import _CorrStats
+
+# =========================
+# Jalur sparse (CSR) untuk matriks minat yang sebagian besar nol
+# =========================
+# Scaling tanpa centering (x / scale) menjaga nol tetap nol. KMeans tidak
+# berubah oleh pergeseran konstan, jadi cluster di ruang x / scale sama dengan
+# di ruang StandardScaler biasa; centroid cukup digeser -mean / scale di akhir
+# dan bundle tetap kompatibel dengan scorer, prediksi dense & ingest.
+SPARSE_CHUNK_ROWS = 65536
+
+
+def to_csr(df, transform=DEFAULT_TRANSFORM, dtype=np.float32, chunk_rows=SPARSE_CHUNK_ROWS):
+    # DataFrame -> CSR per potongan baris (blok dense hanya sebesar chunk)
+    blocks = [sp.csr_matrix(transform.transform(df.iloc[start:start + chunk_rows], dtype=dtype))
+              for start in range(0, len(df), chunk_rows)]
+    if not blocks:
+        return sp.csr_matrix((0, len(transform.output_cols)), dtype=dtype)
+    return sp.vstack(blocks, format="csr")
+
+
+def to_csr_inputs(df, transform=DEFAULT_TRANSFORM, dtype=np.float64, chunk_rows=SPARSE_CHUNK_ROWS):
+    # kolom input mentah saja (format batch untuk CentroidScorer.score_matrix)
+    return to_csr(df, FeatureTransform(transform.input_cols), dtype=dtype, chunk_rows=chunk_rows)
+
+
+def _dense_scaler(scaler, columns):
+    # scaler yang di-fit tanpa centering -> StandardScaler biasa dengan statistik
+    # yang sama (mean_ tetap dihitung sklearn untuk input sparse)
+    dense = copy.deepcopy(scaler)
+    dense.with_mean = True
+    dense.feature_names_in_ = np.asarray(columns, dtype=object)
+    return dense
+
+
+def train_sparse(df, k=FINAL_K, sil_method="auto", sil_sample_size=DEFAULT_SAMPLE_SIZE,
+                 random_state=RANDOM_STATE, n_init=N_INIT):
+    # hasil dengan format yang sama seperti pipeline.train_pipeline -> disimpan lewat registry
+    watch = Stopwatch()
+    lap = watch.lap
+
+    columns = DEFAULT_TRANSFORM.output_cols
+    X = to_csr(df)
+    if X.shape[0] == 0:
+        raise ValueError("Dataset kosong, tidak ada baris untuk training.")
+    lap("csr")
+
+    scaler = StandardScaler(with_mean=False).fit(X)
+    stats = _CorrStats.from_sparse(X, columns)
+    used_cols = stats.used_columns(CORR_THRESHOLD, ZERO_RATIO_MAX)
+    if len(used_cols) < 2:
+        raise ValueError("Kolom yang tersisa untuk clustering kurang dari 2.")
+    idx = [columns.index(c) for c in used_cols]
+    lap("scale_and_correlation")
+
+    # x / scale di kolom terpakai: data CSR dikali per kolom, pola non-zero tetap
+    Xs = X[:, idx].astype(np.float64) @ sp.diags(1.0 / scaler.scale_[idx])
+    Xs = sp.csr_matrix(Xs)
+    model = KMeans(n_clusters=k, random_state=random_state, n_init=n_init).fit(Xs)
+    lap("kmeans")
+
+    # centroid masih di ruang x / scale (sama dengan Xs) sebelum digeser di bawah
+    sil = silhouette(Xs, model.labels_, method=sil_method, sample_size=sil_sample_size,
+                     random_state=random_state, centroids=model.cluster_centers_) if k > 1 else None
+    lap("silhouette")
+
+    # kembali ke ruang StandardScaler biasa: geser centroid -mean / scale
+    shift = scaler.mean_[idx] / scaler.scale_[idx]
+    model.cluster_centers_ = model.cluster_centers_ - shift
+
+    # PCA 2D langsung dari kovarians yang sudah dihitung untuk filter korelasi
+    n = stats.n
+    mean = stats.sum / n
+    cov = (stats.gram - n * np.outer(mean, mean)) / max(n - 1, 1)
+    cov_scaled = cov[np.ix_(idx, idx)] / np.outer(scaler.scale_[idx], scaler.scale_[idx])
+    projection = projection_from_covariance(cov_scaled, np.zeros(len(idx)), n)
+    lap("projection")
+
+    metrics = {
+        "inertia": float(model.inertia_),
+        "silhouette": sil["score"] if sil else None,
+        "silhouette_method": sil["method"] if sil else None,
+        "silhouette_n": sil["n_used"] if sil else None,
+        "cluster_sizes": np.bincount(model.labels_, minlength=k).tolist(),
+        "density": round(X.nnz / max(X.shape[0] * X.shape[1], 1), 4),
+    }
+
+    return {
+        "model": _predict_ready(model),
+        "scaler": _dense_scaler(scaler, columns),
+        "used_cols": used_cols,
+        "transform": DEFAULT_TRANSFORM,
+        "projection": projection,
+        "metrics": metrics,
+        "timings": watch.timings,
+        "rows": int(X.shape[0]),
+        "k": k,
+    }
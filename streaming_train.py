@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import scipy.sparse as sp
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import IncrementalPCA
+from sklearn.preprocessing import StandardScaler
+
+from feature_selection import select_from_correlation
+from features import DEFAULT_TRANSFORM
+from instrumentation import Stopwatch
+from pipeline import CORR_THRESHOLD, FINAL_K, RANDOM_STATE, ZERO_RATIO_MAX
+from projection import PROJECTION_COMPONENTS, Projection
+
+
+def iter_chunks(paths, chunksize=100_000):
+    # baca CSV / Parquet per potongan, tidak pernah load semua baris sekaligus
+    for path in paths:
+        if path.endswith(".parquet"):
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def prepare_chunk(chunk, transform=DEFAULT_TRANSFORM):
+    # layout kolom tetap, fitur turunan dihitung ulang per chunk
+    return transform.transform_frame(chunk)
+
+
+class _CorrStats:
+    # statistik cukup (n, Σx, XᵀX, jumlah nol) untuk korelasi streaming
+    def __init__(self, columns):
+        d = len(columns)
+        self.columns = list(columns)
+        self.n = 0
+        self.sum = np.zeros(d)
+        self.gram = np.zeros((d, d))
+        self.zeros = np.zeros(d)
+        self._shift = None
+
+    @classmethod
+    def from_sparse(cls, X, columns):
+        # CSR utuh: tanpa geser (geser akan mengisi semua nol), XᵀX tetap sparse × sparse
+        X = sp.csr_matrix(X, dtype=np.float64)   # XᵀX float64 (gradyear² besar)
+        stats = cls(columns)
+        stats.n = X.shape[0]
+        stats.sum = np.asarray(X.sum(axis=0), dtype=np.float64).ravel()
+        stats.gram = (X.T @ X).toarray()
+        stats.zeros = stats.n - X.getnnz(axis=0)
+        stats._shift = np.zeros(len(stats.columns))
+        return stats
+
+    def update(self, values):
+        # digeser dengan baris pertama supaya XᵀX stabil secara numerik
+        if self._shift is None:
+            self._shift = values[0].copy()
+        v = values - self._shift
+        self.n += len(v)
+        self.sum += v.sum(axis=0)
+        self.gram += v.T @ v
+        self.zeros += (values == 0).sum(axis=0)
+
+    def used_columns(self, threshold=CORR_THRESHOLD, zero_ratio_max=ZERO_RATIO_MAX):
+        n = self.n
+        mean = self.sum / n
+        cov = (self.gram - n * np.outer(mean, mean)) / max(n - 1, 1)
+        var = np.diag(cov)
+
+        # filter sama seperti ml_model: varians > 0 dan tidak hampir selalu 0
+        keep = (var > 1e-12) & (self.zeros / n < zero_ratio_max)
+        idx = np.flatnonzero(keep)
+        std = np.sqrt(var[idx])
+        corr = np.abs(cov[np.ix_(idx, idx)] / np.outer(std, std))
+
+        # kolom di-drop kalau korelasi > threshold dengan kolom sebelumnya
+        drop, _ = select_from_correlation(corr, [self.columns[i] for i in idx], threshold)
+        return [self.columns[i] for i, d in zip(idx, drop) if not d]
+
+
+def train_streaming(paths, k=FINAL_K, chunksize=100_000, batch_size=4096,
+                    epochs=1, random_state=RANDOM_STATE):
+    # hasil dengan format yang sama seperti pipeline.train_pipeline -> disimpan lewat registry
+    watch = Stopwatch()
+
+    # =========================
+    # Pass 1: scaler.partial_fit + statistik korelasi
+    # =========================
+    scaler = StandardScaler()
+    stats = None
+    columns = None
+    for chunk in iter_chunks(paths, chunksize):
+        frame = prepare_chunk(chunk)
+        if columns is None:
+            columns = frame.columns.tolist()
+            stats = _CorrStats(columns)
+        scaler.partial_fit(frame)
+        stats.update(frame.values)
+
+    if stats is None or stats.n == 0:
+        raise ValueError("Dataset kosong, tidak ada baris untuk training.")
+
+    used_cols = stats.used_columns()
+    if len(used_cols) < 2:
+        raise ValueError("Kolom yang tersisa untuk clustering kurang dari 2.")
+    idx = [columns.index(c) for c in used_cols]
+    watch.lap("scale_and_correlation")
+
+    # =========================
+    # Pass 2: MiniBatchKMeans.partial_fit (+ IncrementalPCA 2D) di atas data scaled
+    # =========================
+    model = MiniBatchKMeans(n_clusters=k, random_state=random_state,
+                            batch_size=batch_size, n_init=3)
+    pca = IncrementalPCA(n_components=PROJECTION_COMPONENTS)
+    # jumlah anggota per cluster (epoch terakhir, label chunk setelah chunk itu di-fit);
+    # labels_ MiniBatchKMeans hanya berisi mini-batch terakhir
+    sizes = np.zeros(k, dtype=np.int64)
+    for epoch in range(epochs):
+        for chunk in iter_chunks(paths, chunksize):
+            X = scaler.transform(prepare_chunk(chunk))[:, idx]
+            # PCA cukup satu epoch; chunk lebih kecil dari n_components dilewati
+            if epoch == 0 and len(X) >= PROJECTION_COMPONENTS:
+                pca.partial_fit(X)
+            for start in range(0, len(X), batch_size):
+                batch = X[start:start + batch_size]
+                # batch awal harus >= k titik untuk inisialisasi centroid
+                if not hasattr(model, "cluster_centers_") and len(batch) < k:
+                    continue
+                model.partial_fit(batch)
+            if epoch == epochs - 1 and hasattr(model, "cluster_centers_"):
+                sizes += np.bincount(model.predict(X), minlength=k)
+
+    watch.lap("minibatch_kmeans")
+
+    return {
+        "model": model,
+        "scaler": scaler,
+        "used_cols": used_cols,
+        "transform": DEFAULT_TRANSFORM,
+        "projection": Projection.from_estimator(pca, "incremental"),
+        "metrics": {"cluster_sizes": sizes.tolist()},
+        "timings": watch.timings,
+        "rows": int(stats.n),
+        "k": k,
+    }
@@ -0,0 +1,14 @@
+from aggregates import arts_sports_points, compute_aggregates, merge_aggregates
+from bench import synthetic_students
+
+
+def test_arts_sports_histogram_is_additive():
+    df = synthetic_students(3000)
+    head, tail = df.iloc[:2000].reset_index(drop=True), df.iloc[2000:].reset_index(drop=True)
+    merged = merge_aggregates(compute_aggregates(head), compute_aggregates(tail))
+    full = compute_aggregates(df)
+
+    assert merged["arts_sports_counts"] == full["arts_sports_counts"]
+    points = arts_sports_points(merged)
+    assert points["count"].sum() == len(df)
+    assert list(points.columns) == ["arts_interest", "sports_interest", "count"]
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+import dataset
+
+
+def test_writes_to_loaded_frame_do_not_change_cached_frame():
+    df = dataset.load_dataset()
+    before = df.iloc[:5].copy()
+    col = "music"
+
+    df["kolom_baru"] = 1
+    df[col] = 99
+    df = dataset.load_dataset()
+    assert "kolom_baru" not in df.columns
+    np.testing.assert_array_equal(df.iloc[:5][col].to_numpy(), before[col].to_numpy())
+
+    # tulis langsung ke array di belakang frame bersama -> ditolak
+    with pytest.raises(ValueError):
+        dataset.load_dataset()[col].to_numpy()[0] = 99
+    np.testing.assert_array_equal(dataset.load_dataset().iloc[:5].to_numpy(), before.to_numpy())
+
+
+def test_frame_with_ingest_batches_is_read_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset, "APPEND_DIR", str(tmp_path))
+    monkeypatch.setattr(dataset, "_LOADED", {})
+    base = dataset.load_dataset()
+    dataset.append_rows(base.head(5))
+
+    df = dataset.load_dataset()
+    assert len(df) == len(base) + 5
+    with pytest.raises(ValueError):
+        df["music"].to_numpy()[0] = 99
+    df["music"] = 0
+    assert dataset.load_dataset()["music"].to_numpy()[0] == base["music"].to_numpy()[0]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import ingest
+from bench import synthetic_students
+from streaming_train import train_streaming
+
+
+@pytest.fixture
+def streaming_bundle(tmp_path):
+    df = synthetic_students(6000)
+    path = tmp_path / "students.csv"
+    df.to_csv(path, index=False)
+    result = train_streaming([str(path)], chunksize=2500, batch_size=1024)
+    manifest = {"data": {"rows": result["rows"]}, "metrics": result["metrics"], "k": result["k"]}
+    bundle = {"version": "streaming-test", "manifest": manifest, **result}
+    return bundle, df
+
+
+def test_streaming_bundle_baseline_covers_all_training_rows(streaming_bundle, monkeypatch):
+    bundle, df = streaming_bundle
+    # MiniBatchKMeans.labels_ hanya mini-batch terakhir -> tidak boleh jadi baseline
+    assert len(bundle["model"].labels_) < bundle["rows"]
+    assert ingest._baseline_sizes(bundle).sum() == bundle["rows"]
+
+    saved = {}
+    monkeypatch.setattr(ingest, "load_bundle", lambda: bundle)
+    monkeypatch.setattr(ingest, "dataset_version", lambda: "base")
+    monkeypatch.setattr(ingest, "load_aggregates", lambda version: None)
+    monkeypatch.setattr(ingest, "conform_rows", lambda rows: rows)
+    monkeypatch.setattr(ingest, "append_rows", lambda rows: "new")
+    monkeypatch.setattr(ingest, "append_aggregates", lambda *args: None)
+    monkeypatch.setattr(ingest, "save_bundle", lambda *args, **kwargs: saved.update(manifest=args[3]) or "child")
+
+    new_rows = df.head(200)
+    report = ingest.ingest(new_rows, refresh_centroids=True)
+    assert report["version"] == "child"
+    assert sum(saved["manifest"]["metrics"]["cluster_sizes"]) == bundle["rows"] + len(new_rows)
+
+
+def test_baseline_rejects_partial_labels(streaming_bundle):
+    bundle, _ = streaming_bundle
+    bundle["manifest"]["metrics"] = {}
+    with pytest.raises(ValueError):
+        ingest._baseline_sizes(bundle)
+    bundle["manifest"]["data"]["rows"] = len(bundle["model"].labels_)
+    assert np.isclose(ingest._baseline_sizes(bundle).sum(), len(bundle["model"].labels_))
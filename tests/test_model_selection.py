@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from evaluation import silhouette
+from ml_report import _final_fit
+from model_selection import clear_memo, select_k
+
+
+def test_gap_on_unstructured_data_keeps_two_clusters():
+    # N(0, 1) tanpa struktur cluster: gap memilih k = 1, model final tetap k = 2
+    clear_memo()
+    X = np.random.default_rng(0).standard_normal((600, 4))
+    result = select_k(X, criterion="gap", k_max=6, n_init=2, sil_sample_size=300)
+
+    assert result["selection"]["k_criterion"] == 1
+    assert result["k"] == 2
+    assert 2 in result["models"]
+    assert result["model"].n_clusters == 2
+    assert 2 in result["k_sil"]
+    assert len(result["sil_info"]) == len(result["k_sil"])
+
+    final = _final_fit(result)
+    assert final["k"] == 2
+    assert len(final["labels"]) == len(X)
+
+
+def test_final_fit_rejects_missing_model():
+    sweep = {"k": 3, "models": {}}
+    with pytest.raises(ValueError):
+        _final_fit(sweep)
+
+
+def test_reported_silhouette_matches_final_model():
+    clear_memo()
+    rng = np.random.default_rng(1)
+    X = np.vstack([rng.normal(c, 0.6, size=(200, 3)) for c in (0.0, 3.0, 6.0)])
+    for criterion in ("silhouette", "gap"):
+        result = select_k(X, criterion=criterion, k_max=5, n_init=3, sil_method="exact")
+        final = result["model"]
+        expected = silhouette(X, final.labels_, method="exact")["score"]
+        assert np.isclose(result["sil_scores"][result["k_sil"].index(result["k"])], expected)
+        selection = result["selection"]
+        assert selection["fits_saved"] == selection["fits_baseline"] - selection["fits"]
+        if criterion == "gap":
+            assert selection["reference_fits"] > 0
+            assert selection["fits"] >= selection["reference_fits"]
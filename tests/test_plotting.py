@@ -0,0 +1,14 @@
+import numpy as np
+import pandas as pd
+
+from plotting import GRID_BINS, scatter_counts
+
+
+def test_scatter_counts_rebins_large_histograms():
+    rng = np.random.default_rng(0)
+    n = GRID_BINS * GRID_BINS + 500
+    points = pd.DataFrame({"a": rng.random(n), "b": rng.random(n), "count": rng.integers(1, 5, n)})
+    fig, mode = scatter_counts(points, x="a", y="b")
+    assert mode == "binned"
+    assert sum(fig.data[0].marker.size) == points["count"].sum()
+    assert len(fig.data[0].x) <= GRID_BINS * GRID_BINS
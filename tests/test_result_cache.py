@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+import result_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_DIR", str(tmp_path))
+    monkeypatch.setattr(result_cache, "INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setattr(result_cache, "_MEMO", result_cache.LRUMemo(result_cache._MEMO_SIZE))
+    monkeypatch.setattr(result_cache, "_INDEX", {})
+    return tmp_path
+
+
+def test_corrupt_entry_is_a_miss_and_removed(cache_dir):
+    key = result_cache.cache_key("test", "v1", {})
+    path = os.path.join(str(cache_dir), f"{key}.joblib")
+    with open(path, "wb") as f:
+        f.write(b"\x80\x04bukan joblib")
+    assert result_cache.get(key) is None
+    assert not os.path.exists(path)
+
+
+def test_failed_compute_releases_key_lock():
+    def fail():
+        raise RuntimeError("gagal")
+
+    with pytest.raises(RuntimeError):
+        result_cache.get_or_compute("test", "v1", {}, fail)
+    assert result_cache._KEY_LOCKS == {}
+    value, cached = result_cache.get_or_compute("test", "v1", {}, lambda: 42)
+    assert (value, cached) == (42, False)
+
+
+def test_index_entries_skip_memo_and_eviction(cache_dir):
+    result_cache.put_index("dag-digest-x", "abc")
+    assert result_cache.get_index("dag-digest-x") == "abc"
+    assert "dag-digest-x" not in result_cache._MEMO
+    result_cache.evict(max_bytes=0)
+    result_cache._INDEX.clear()
+    assert result_cache.get_index("dag-digest-x") == "abc"
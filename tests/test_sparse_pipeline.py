@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from evaluation import silhouette
+from features import DEFAULT_TRANSFORM
+from sparse_pipeline import train_sparse
+
+
+def test_simplified_silhouette_sparse_matches_dense():
+    rng = np.random.default_rng(0)
+    X = rng.poisson(0.3, size=(500, 6)).astype(np.float64)
+    labels = (X[:, 0] > 0).astype(int)
+    dense = silhouette(X, labels, method="simplified")["score"]
+    sparse = silhouette(sp.csr_matrix(X), labels, method="simplified")["score"]
+    assert np.isclose(dense, sparse)
+
+
+def test_train_sparse_with_simplified_silhouette():
+    rng = np.random.default_rng(0)
+    cols = DEFAULT_TRANSFORM.input_cols
+    df = pd.DataFrame(rng.poisson(0.4, size=(400, len(cols))), columns=cols)
+    result = train_sparse(df, k=2, sil_method="simplified", n_init=2)
+    metrics = result["metrics"]
+    assert metrics["silhouette_method"] == "simplified"
+    assert -1.0 <= metrics["silhouette"] <= 1.0
@@ -0,0 +1,99 @@
+import argparse
+import glob
+import os
+import time
+
+from dataset import dataset_version, file_sha256, load_dataset
+from evaluation import DEFAULT_SAMPLE_SIZE, SILHOUETTE_METHODS
+from model_selection import K_SELECTION_MODES, describe_fits
+from pipeline import CORR_THRESHOLD, FINAL_K, K_VALUES, N_INIT, RANDOM_STATE, SWEEP_N_JOBS, train_pipeline
+from registry import save_bundle
+from sparse_pipeline import train_sparse
+from streaming_train import train_streaming
+
+
+def run_full(source, k, sil_method, sil_sample_size, n_jobs, k_select="fixed"):
+    df = load_dataset(source)
+    result = train_pipeline(df, k=k, sil_method=sil_method, sil_sample_size=sil_sample_size, n_jobs=n_jobs,
+                            k_select=k_select)
+    data = {"source": source or "default", "sha256": dataset_version(source), "rows": result["rows"]}
+    params = {"k_values": list(K_VALUES), "random_state": RANDOM_STATE, "n_init": N_INIT,
+              "corr_threshold": CORR_THRESHOLD, "silhouette_method": sil_method, "n_jobs": n_jobs,
+              "k_select": k_select}
+    return result, data, params
+
+
+def run_sparse(source, k, sil_method, sil_sample_size):
+    df = load_dataset(source)
+    result = train_sparse(df, k=k, sil_method=sil_method, sil_sample_size=sil_sample_size)
+    data = {"source": source or "default", "sha256": dataset_version(source), "rows": result["rows"]}
+    params = {"random_state": RANDOM_STATE, "n_init": N_INIT, "corr_threshold": CORR_THRESHOLD,
+              "silhouette_method": sil_method, "scaling": "scale-only (CSR)"}
+    return result, data, params
+
+
+def run_streaming(paths, k, chunksize, batch_size, epochs):
+    result = train_streaming(paths, k=k, chunksize=chunksize, batch_size=batch_size, epochs=epochs)
+    digest = "-".join(file_sha256(p)[:16] for p in paths)
+    data = {"source": [os.path.basename(p) for p in paths], "sha256": digest, "rows": result["rows"]}
+    params = {"chunksize": chunksize, "batch_size": batch_size, "epochs": epochs,
+              "random_state": RANDOM_STATE, "corr_threshold": CORR_THRESHOLD}
+    return result, data, params
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Training model clustering siswa secara offline (tanpa Streamlit).")
+    parser.add_argument("--mode", choices=["full", "sparse", "streaming"], default="full")
+    parser.add_argument("--source", nargs="*", default=None,
+                        help="file dataset (full/sparse: satu file xlsx/csv, streaming: CSV/Parquet, boleh glob)")
+    parser.add_argument("--k", type=int, default=FINAL_K)
+    parser.add_argument("--select-k", choices=list(K_SELECTION_MODES), default="fixed",
+                        help="mode full: pilih k otomatis dengan early stopping (k_max = batas K_VALUES)")
+    parser.add_argument("--silhouette", choices=list(SILHOUETTE_METHODS), default="auto")
+    parser.add_argument("--sample-size", type=int, default=DEFAULT_SAMPLE_SIZE)
+    parser.add_argument("--n-jobs", type=int, default=SWEEP_N_JOBS,
+                        help="jumlah proses untuk sweep (k, seed) paralel; 0 = semua core")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--epochs", type=int, default=1)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.mode == "full":
+        source = args.source[0] if args.source else None
+        result, data, params = run_full(source, args.k, args.silhouette, args.sample_size, args.n_jobs or None,
+                                        args.select_k)
+    elif args.mode == "sparse":
+        source = args.source[0] if args.source else None
+        result, data, params = run_sparse(source, args.k, args.silhouette, args.sample_size)
+    else:
+        paths = sorted(p for pattern in (args.source or ["students_clustered.csv"]) for p in glob.glob(pattern))
+        if not paths:
+            parser.error("Tidak ada file yang cocok untuk mode streaming.")
+        result, data, params = run_streaming(paths, args.k, args.chunksize, args.batch_size, args.epochs)
+
+    manifest = {
+        "mode": args.mode,
+        "data": data,
+        "features": {
+            "scaler_features": list(result["scaler"].feature_names_in_),
+            "used_cols": result["used_cols"],
+            "transform_output": result["transform"].output_cols,
+        },
+        "k": result["k"],
+        "params": params,
+        "metrics": result.get("metrics", {}),
+        "timing": dict(result.get("timings", {}), total=round(time.perf_counter() - t0, 4)),
+    }
+    version = save_bundle(result["model"], result["scaler"], result["used_cols"], manifest,
+                          transform=result["transform"], projection=result.get("projection"))
+    print(f"✅ Bundle {version}: {data['rows']:,} baris, k={result['k']}, "
+          f"{len(result['used_cols'])} fitur, {manifest['timing']['total']:.1f} detik")
+    selection = result.get("metrics", {}).get("k_selection")
+    if selection:
+        print(f"   k dipilih otomatis ({selection['criterion']}): berhenti di k={selection['stopped_at']}, "
+              f"{describe_fits(selection)}")
+
+
+if __name__ == "__main__":
+    main()
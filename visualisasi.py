@@ -2,9 +2,14 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import numpy as np
+from aggregates import arts_sports_points, interest_level_counts, interest_means, kpis, load_aggregates
+from instrumentation import span
+from plotting import render_caption, scatter_counts
 
 def chart():
-    df = pd.read_excel("students_clustered.xlsx")
+    # KPI, pie & bar dibaca dari aggregate store (dihitung sekali per versi dataset)
+    with span("chart.load_aggregates"):
+        agg = load_aggregates()
 
     # =========================
     # Warna biru pastel (konsisten)
@@ -13,31 +18,16 @@ def chart():
     PASTEL_BLUE_MAIN = "#6baed6"   # dipakai bar/scatter
     KPI_BG = "#eef6ff"            # biru pastel sangat muda
 
-    # =========================
-    # Feature Engineering (untuk KPI & chart)
-    # =========================
-    interest_cols = [
-        'dance', 'band', 'marching', 'music', 'rock', 'hair', 'dress', 'blonde',
-        'basketball', 'football', 'soccer', 'softball', 'volleyball',
-        'swimming', 'cheerleading', 'baseball', 'tennis', 'sports'
-    ]
-    interest_cols = [c for c in interest_cols if c in df.columns]
-
-    arts_cols = [c for c in ['dance','band','marching','music','rock','hair','dress','blonde'] if c in df.columns]
-    sports_cols = [c for c in ['basketball','football','soccer','softball','volleyball','swimming','cheerleading','baseball','tennis','sports'] if c in df.columns]
-
-    df["arts_interest"] = df[arts_cols].sum(axis=1) if len(arts_cols) > 0 else 0
-    df["sports_interest"] = df[sports_cols].sum(axis=1) if len(sports_cols) > 0 else 0
-    df["active_interest_count"] = (df[interest_cols] > 0).sum(axis=1) if len(interest_cols) > 0 else 0
-    df["total_interest"] = df[interest_cols].sum(axis=1) if len(interest_cols) > 0 else 0
+    interest_cols = agg["interest_cols"]
 
     # =========================
     # KPI Cards (semua biru pastel)
     # =========================
-    total_siswa = int(len(df))
-    avg_friends = df["NumberOffriends"].mean() if "NumberOffriends" in df.columns else np.nan
-    avg_active_interest = df["active_interest_count"].mean() if len(interest_cols) > 0 else np.nan
-    dominant = "Arts" if df["arts_interest"].sum() > df["sports_interest"].sum() else "Sports"
+    kpi = kpis(agg)
+    total_siswa = int(kpi["total_siswa"])
+    avg_friends = kpi["avg_friends"]
+    avg_active_interest = kpi["avg_active_interest"]
+    dominant = kpi["dominant"]
 
     st.markdown("""
     <style>
@@ -114,43 +104,44 @@ def chart():
 
     with col5:
         st.markdown("#### Distribusi Tahun Kelulusan Siswa")
-        if "gradyear" in df.columns:
-            graduation_year_count = df["gradyear"].value_counts().reset_index()
-            graduation_year_count.columns = ["gradyear", "count"]
-
-            fig1 = px.pie(
-                graduation_year_count,
-                names="gradyear",
-                values="count",
-                hole=0.35,
-                color_discrete_sequence=PASTEL_BLUES
-            )
-            fig1 = style_pie(fig1)
-            st.plotly_chart(fig1, use_container_width=True)
-        else:
-            st.info("Kolom 'gradyear' tidak ditemukan di dataset.")
+        with span("chart.pie_gradyear"):
+            if agg["gradyear_counts"] is not None:
+                graduation_year_count = pd.DataFrame(
+                    sorted(agg["gradyear_counts"].items()), columns=["gradyear", "count"]
+                )
+
+                fig1 = px.pie(
+                    graduation_year_count,
+                    names="gradyear",
+                    values="count",
+                    hole=0.35,
+                    color_discrete_sequence=PASTEL_BLUES
+                )
+                fig1 = style_pie(fig1)
+                st.plotly_chart(fig1, use_container_width=True)
+            else:
+                st.info("Kolom 'gradyear' tidak ditemukan di dataset.")
 
     with col6:
         st.markdown("#### Proporsi Siswa Berdasarkan Jumlah Minat")
-        if len(interest_cols) > 0:
-            bins = [-1, 3, 6, len(interest_cols)]
-            labels = ["Low", "Medium", "High"]
-            df["interest_level"] = pd.cut(df["active_interest_count"], bins=bins, labels=labels)
-
-            interest_level_count = df["interest_level"].value_counts().reset_index()
-            interest_level_count.columns = ["interest_level", "count"]
-
-            fig2 = px.pie(
-                interest_level_count,
-                names="interest_level",
-                values="count",
-                hole=0.35,
-                color_discrete_sequence=PASTEL_BLUES
-            )
-            fig2 = style_pie(fig2)
-            st.plotly_chart(fig2, use_container_width=True)
-        else:
-            st.info("Tidak ada kolom minat yang ditemukan untuk visualisasi proporsi jumlah minat.")
+        with span("chart.pie_interest_level"):
+            if len(interest_cols) > 0:
+                # Low 0-3, Medium 4-6, High >6 minat aktif (dari histogram jumlah minat aktif)
+                interest_level_count = pd.DataFrame(
+                    interest_level_counts(agg), columns=["interest_level", "count"]
+                )
+
+                fig2 = px.pie(
+                    interest_level_count,
+                    names="interest_level",
+                    values="count",
+                    hole=0.35,
+                    color_discrete_sequence=PASTEL_BLUES
+                )
+                fig2 = style_pie(fig2)
+                st.plotly_chart(fig2, use_container_width=True)
+            else:
+                st.info("Tidak ada kolom minat yang ditemukan untuk visualisasi proporsi jumlah minat.")
 
     st.markdown("---")
 
@@ -160,28 +151,21 @@ def chart():
     st.subheader("Rata-rata Minat Siswa")
     st.write("Menampilkan rata-rata minat siswa pada berbagai aktivitas.")
 
-    interest_columns = [c for c in [
-        'basketball', 'football', 'soccer', 'softball', 'volleyball',
-        'swimming', 'cheerleading', 'baseball','tennis', 'sports',
-        'dance', 'band', 'marching', 'music', 'rock',
-        'hair', 'dress', 'blonde',
-    ] if c in df.columns]
-
-    if len(interest_columns) > 0:
-        avg_interests = df[interest_columns].mean().reset_index()
-        avg_interests.columns = ["Interest", "Average Score"]
-
-        fig_avg = px.bar(
-            avg_interests,
-            x="Interest",
-            y="Average Score",
-            labels={"Interest": "Minat", "Average Score": "Rata-rata Nilai"},
-            color_discrete_sequence=[PASTEL_BLUE_MAIN]
-        )
-        fig_avg.update_layout(height=450, margin=dict(l=10, r=10, t=30, b=10))
-        st.plotly_chart(fig_avg, use_container_width=True)
-    else:
-        st.info("Tidak ada kolom minat yang ditemukan untuk visualisasi rata-rata.")
+    with span("chart.bar_interest_means"):
+        if len(interest_cols) > 0:
+            avg_interests = pd.DataFrame(interest_means(agg), columns=["Interest", "Average Score"])
+
+            fig_avg = px.bar(
+                avg_interests,
+                x="Interest",
+                y="Average Score",
+                labels={"Interest": "Minat", "Average Score": "Rata-rata Nilai"},
+                color_discrete_sequence=[PASTEL_BLUE_MAIN]
+            )
+            fig_avg.update_layout(height=450, margin=dict(l=10, r=10, t=30, b=10))
+            st.plotly_chart(fig_avg, use_container_width=True)
+        else:
+            st.info("Tidak ada kolom minat yang ditemukan untuk visualisasi rata-rata.")
 
     st.markdown("---")
 
@@ -191,22 +175,24 @@ def chart():
     st.subheader("Distribusi Jumlah Minat Aktif Siswa")
     st.write("Jumlah minat aktif menunjukkan seberapa beragam minat yang dimiliki seorang siswa.")
 
-    if len(interest_columns) > 0:
-        df["active_interest_count"] = df[interest_columns].gt(0).sum(axis=1)
-        active_interest_count = df["active_interest_count"].value_counts().reset_index()
-        active_interest_count.columns = ["active_interest_count", "count"]
-
-        fig5 = px.bar(
-            active_interest_count,
-            x="active_interest_count",
-            y="count",
-            labels={"active_interest_count": "Jumlah Minat Aktif", "count": "Jumlah Siswa"},
-            color_discrete_sequence=[PASTEL_BLUE_MAIN]
-        )
-        fig5.update_layout(height=450, margin=dict(l=10, r=10, t=30, b=10))
-        st.plotly_chart(fig5, use_container_width=True)
-    else:
-        st.info("Tidak ada kolom minat yang ditemukan untuk visualisasi distribusi jumlah minat aktif.")
+    with span("chart.bar_active_interest_count"):
+        if len(interest_cols) > 0:
+            active_interest_count = pd.DataFrame(
+                [(int(k), v) for k, v in agg["active_count_hist"].items()],
+                columns=["active_interest_count", "count"]
+            )
+
+            fig5 = px.bar(
+                active_interest_count,
+                x="active_interest_count",
+                y="count",
+                labels={"active_interest_count": "Jumlah Minat Aktif", "count": "Jumlah Siswa"},
+                color_discrete_sequence=[PASTEL_BLUE_MAIN]
+            )
+            fig5.update_layout(height=450, margin=dict(l=10, r=10, t=30, b=10))
+            st.plotly_chart(fig5, use_container_width=True)
+        else:
+            st.info("Tidak ada kolom minat yang ditemukan untuk visualisasi distribusi jumlah minat aktif.")
 
     st.markdown("---")
 
@@ -214,12 +200,18 @@ def chart():
     # 5. Arts vs Sports Scatter (marker biru pastel)
     # =========================
     st.subheader("Pola Minat: Arts vs Sports (Scatter)")
-    fig_scatter = px.scatter(
-        df,
-        x="arts_interest",
-        y="sports_interest",
-        labels={"arts_interest": "Minat Arts", "sports_interest": "Minat Sports"}
-    )
-    fig_scatter.update_traces(marker=dict(size=7, opacity=0.6, color=PASTEL_BLUE_MAIN))
-    fig_scatter.update_layout(height=500, margin=dict(l=10, r=10, t=50, b=10))
-    st.plotly_chart(fig_scatter, use_container_width=True)
\ No newline at end of file
+    # histogram Arts × Sports dari aggregate store: jumlah titik = pasangan nilai unik,
+    # tidak tergantung jumlah siswa (tanpa load dataset / FeatureTransform per render)
+    with span("chart.scatter_points"):
+        points = arts_sports_points(agg)
+    with span("chart.scatter_figure"):
+        fig_scatter, scatter_mode = scatter_counts(
+            points,
+            x="arts_interest",
+            y="sports_interest",
+            marker_color=PASTEL_BLUE_MAIN,
+            labels={"arts_interest": "Minat Arts", "sports_interest": "Minat Sports", "count": "Jumlah Siswa"}
+        )
+        fig_scatter.update_layout(height=500, margin=dict(l=10, r=10, t=50, b=10))
+        st.plotly_chart(fig_scatter, use_container_width=True)
+    st.caption(render_caption(scatter_mode, total_siswa))